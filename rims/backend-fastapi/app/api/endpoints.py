@@ -1,10 +1,35 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, FileResponse
 from pydantic import BaseModel
+from typing import List
 import sys
 import os
+import asyncio
+import json
+import hashlib
+import logging
+import re
+import secrets
+import threading
+import time
 import httpx
+from functools import partial
 from app.core.config import settings
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../ml'))
+from app.services.batching import MicroBatcher
+from app.services.cache import TieredCache
+from app.services.coalescing import SingleFlight
+from app.services.prefetch import PrefetchScheduler
+from app.services.startup import StartupReport
+from app.services.metrics import (
+    registry as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricFamily, histogram_family,
+    PIPELINE_STAGE_MS, ANALYSIS_PROCESSING_MS, ANALYSIS_RESULTS, ANALYSIS_ERRORS, ANALYSIS_FALLBACKS,
+    AIR_QUALITY_CACHE_LOOKUPS, UPSTREAM_REQUEST_MS
+)
+from app.services.upstream import UpstreamPool
+from app.services.worker_pool import AudioWorkerPool
+ML_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../ml'))
+sys.path.append(ML_PATH)
+from pipeline_logging import log_event, current_request_id
 
 # Pydantic models for request validation
 class AnalysisData(BaseModel):
@@ -24,87 +49,644 @@ class ReportRequest(BaseModel):
 
 router = APIRouter()
 
-# Initialize ML inference engine
+# Initialize ML inference engine (once, from the app lifespan)
 inference_engine = None
+_engine_lock = threading.Lock()
+# Set while a request handler retries a failed load, so nobody uses the engine before its pools are up
+_engine_retrying = False
+# Earliest time.monotonic() for the next retry, and the delay after that one fails
+_engine_retry_at = 0.0
+_engine_retry_backoff = settings.ENGINE_RETRY_BACKOFF_SECONDS
 
-# Cache for air quality data (per location)
-air_quality_cache = {}
-CACHE_DURATION = 300  # 5 minutes in seconds
+# Startup-time breakdown served by /health/ready
+startup_report = StartupReport()
+
+# Models paths are handled internally by the engine, but we can pass them
+MODEL_PATH = 'models/respira_net_v1.pt'
+SCALER_PATH = 'models/scaler.pkl'
+# Scaler + folded BatchNorm baked into one state_dict; a build artifact of
+# ml/inference_pipeline.py export_serving_model (the API only reads it)
+SERVING_MODEL_PATH = 'models/respira_net_v1_serving.pt'
+
+# Coalesces concurrent forward passes (started in the app lifespan)
+micro_batcher = None
+
+# Runs the blocking audio pipeline off the event loop (started in the app lifespan)
+worker_pool = None
+
+# Content-addressed /analyze result cache
+result_cache = None
+
+# Shared keep-alive HTTP client for OpenAQ / Gemini (started in the app lifespan)
+upstream_pool = None
+
+# Number of open live screening WebSockets
+live_sessions = 0
+
+# Cache for air quality data (per location), bounded in memory with an optional shared SQLite tier
+air_quality_cache = None
+CACHE_DURATION = settings.AIR_QUALITY_CACHE_TTL_SECONDS
+
+# One OpenAQ fetch in flight per location; also runs stale-while-revalidate refreshes
+air_quality_flights = SingleFlight()
+
+# Refreshes the most requested locations ahead of expiry (started in the app lifespan)
+air_quality_prefetcher = None
+
+def inference_backend_options():
+    """Constructor options for the configured inference backend"""
+    if settings.INFERENCE_BACKEND == "onnx":
+        return {
+            "onnx_path": settings.ONNX_MODEL_PATH,
+            "intra_op_threads": settings.ONNX_INTRA_OP_THREADS,
+            "inter_op_threads": settings.ONNX_INTER_OP_THREADS
+        }
+    return {}
+
+def serving_model_path():
+    """Prefer the exported serving model; fall back to raw weights + pickled scaler when it has not been built"""
+    if os.path.exists(os.path.join(os.path.dirname(ML_PATH), SERVING_MODEL_PATH)):
+        return SERVING_MODEL_PATH
+    return MODEL_PATH
 
 def get_inference_engine():
-    global inference_engine
-    if inference_engine is None:
+    """The shared engine for request handlers; None until startup (load, warm-up, pools) has finished"""
+    if not startup_report.finished or _engine_retrying:
+        return None
+    return inference_engine
+
+async def acquire_inference_engine():
+    """get_inference_engine(), retrying a failed startup load off the event loop (one retry at a time, with backoff)"""
+    global _engine_retrying, _engine_retry_backoff
+    if (startup_report.finished and inference_engine is None and not _engine_retrying
+            and time.monotonic() >= _engine_retry_at):
+        _engine_retrying = True
         try:
-            from inference_pipeline import UrbanVoiceInference
-            # Models paths are handled internally by the class now, but we can pass them
-            model_path = 'models/respira_net_v1.pt'
-            scaler_path = 'models/scaler.pkl'
-            inference_engine = UrbanVoiceInference(model_path=model_path, scaler_path=scaler_path)
-            print("[OK] ML Inference Engine initialized")
+            engine = await asyncio.to_thread(ensure_inference_engine)
+            if engine is not None:
+                await start_engine_services(engine)
+                startup_report.ready, startup_report.error = True, None
+                _engine_retry_backoff = settings.ENGINE_RETRY_BACKOFF_SECONDS
+                print("[OK] ML engine loaded on retry")
+            else:
+                schedule_engine_retry()
         except Exception as e:
-            print(f"[ERROR] Critical failure initializing ML engine: {e}")
-            import traceback
-            traceback.print_exc()
-            # Still set to None so we try again or handle as null
-            inference_engine = None
+            print(f"[ERROR] Engine retry failed: {e}")
+            schedule_engine_retry()
+        finally:
+            _engine_retrying = False
+    return get_inference_engine()
+
+def schedule_engine_retry():
+    global _engine_retry_at, _engine_retry_backoff
+    _engine_retry_at = time.monotonic() + _engine_retry_backoff
+    _engine_retry_backoff = min(_engine_retry_backoff * 2, settings.ENGINE_RETRY_MAX_BACKOFF_SECONDS)
+
+def ensure_inference_engine():
+    """Load the engine if needed (blocking; call off the event loop). None if loading failed or is already in progress elsewhere"""
+    if inference_engine is not None:
+        return inference_engine
+    if not _engine_lock.acquire(blocking=False):
+        return None
+    try:
+        if inference_engine is None:
+            _load_inference_engine()
+    finally:
+        _engine_lock.release()
     return inference_engine
 
-# Pre-initialize at module load
-try:
-    get_inference_engine()
-except:
-    pass
+def _load_inference_engine():
+    global inference_engine
+    try:
+        # torch (and the rest of ml/) is only imported here, not when the app module loads
+        with startup_report.phase("import_ml"):
+            from inference_pipeline import UrbanVoiceInference
+        with startup_report.phase("engine_init"):
+            inference_engine = UrbanVoiceInference(
+                model_path=serving_model_path(),
+                scaler_path=SCALER_PATH,
+                feature_store_dir=settings.FEATURE_STORE_DIR or None,
+                backend=settings.INFERENCE_BACKEND,
+                backend_options=inference_backend_options()
+            )
+        for name, elapsed_ms in inference_engine.init_timing.items():
+            startup_report.record(f"engine.{name.removesuffix('_ms')}", elapsed_ms)
+        print("[OK] ML Inference Engine initialized")
+    except Exception as e:
+        print(f"[ERROR] Critical failure initializing ML engine: {e}")
+        import traceback
+        traceback.print_exc()
+        # Still set to None so we try again or handle as null
+        inference_engine = None
+
+def warmup_options():
+    """warm_up() keyword arguments from settings, or None when warm-up is disabled"""
+    if not settings.WARMUP_ENABLED:
+        return None
+    return {
+        "batch_sizes": [int(size) for size in settings.WARMUP_BATCH_SIZES.split(",") if size.strip()],
+        "max_rounds": settings.WARMUP_MAX_ROUNDS,
+        "tolerance": settings.WARMUP_P99_TOLERANCE
+    }
+
+def warm_up_engine(engine):
+    from warmup import warm_up
+    return warm_up(engine, **warmup_options())
+
+async def start_engine_services(engine):
+    """Warm the loaded engine, then start the worker pool and micro-batcher around it"""
+    if warmup_options() is not None:
+        with startup_report.phase("warmup"):
+            startup_report.warmup = await asyncio.to_thread(warm_up_engine, engine)
+    with startup_report.phase("worker_pool"):
+        await start_worker_pool()
+    with startup_report.phase("micro_batcher"):
+        await start_micro_batcher()
+
+async def initialize_services():
+    """Load and warm the engine off the event loop, then start the worker pool and micro-batcher; fills startup_report"""
+    try:
+        engine = await asyncio.to_thread(ensure_inference_engine)
+        if engine is not None:
+            await start_engine_services(engine)
+        error = None if inference_engine is not None else "ML engine failed to initialize"
+    except Exception as e:
+        print(f"[ERROR] Startup failed: {e}")
+        error = str(e)
+    if inference_engine is None:
+        schedule_engine_retry()
+    startup_report.finish(ready=inference_engine is not None, error=error)
+    startup_report.print_report()
+
+def get_result_cache():
+    global result_cache
+    if result_cache is None and settings.RESULT_CACHE_ENABLED:
+        result_cache = TieredCache(
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+            db_path=settings.RESULT_CACHE_DB_PATH or None,
+            table="analysis_results",
+            db_max_rows=settings.RESULT_CACHE_DB_MAX_ROWS
+        )
+    return result_cache
+
+def close_result_cache():
+    global result_cache
+    if result_cache is not None:
+        result_cache.close()
+        result_cache = None
+
+def get_air_quality_cache():
+    """Entries outlive CACHE_DURATION so they can still be served while revalidating or after upstream errors"""
+    global air_quality_cache
+    if air_quality_cache is None:
+        air_quality_cache = TieredCache(
+            max_entries=settings.AIR_QUALITY_CACHE_MAX_ENTRIES,
+            ttl_seconds=CACHE_DURATION + max(settings.AIR_QUALITY_STALE_WHILE_REVALIDATE_SECONDS,
+                                             settings.AIR_QUALITY_STALE_IF_ERROR_SECONDS),
+            db_path=settings.AIR_QUALITY_CACHE_DB_PATH or None,
+            table="air_quality",
+            db_max_rows=settings.AIR_QUALITY_CACHE_DB_MAX_ROWS
+        )
+    return air_quality_cache
+
+def close_air_quality_cache():
+    global air_quality_cache
+    if air_quality_cache is not None:
+        air_quality_cache.close()
+        air_quality_cache = None
+
+async def cache_call(cache, method, *args, **kwargs):
+    """cache.<method>(...), run off the event loop when the cache has a (blocking) SQLite tier"""
+    if cache.disk is None:
+        return getattr(cache, method)(*args, **kwargs)
+    return await asyncio.to_thread(getattr(cache, method), *args, **kwargs)
+
+def result_cache_key(engine, content):
+    """Hash of the audio bytes plus the model/preprocessing fingerprint"""
+    audio_digest = hashlib.sha256(content).hexdigest()
+    config_digest = hashlib.sha256(engine.cache_fingerprint().encode()).hexdigest()[:16]
+    return f"{audio_digest}:{config_digest}"
+
+async def start_worker_pool():
+    global worker_pool
+    engine = inference_engine
+    if engine is None or worker_pool is not None:
+        return
+    worker_pool = AudioWorkerPool(
+        engine,
+        mode=settings.AUDIO_EXECUTION_MODE,
+        workers=settings.AUDIO_WORKERS,
+        ml_path=ML_PATH,
+        model_path=serving_model_path(),
+        scaler_path=SCALER_PATH,
+        torch_threads=settings.AUDIO_WORKER_TORCH_THREADS,
+        feature_store_dir=settings.FEATURE_STORE_DIR or None,
+        backend=settings.INFERENCE_BACKEND,
+        backend_options=inference_backend_options(),
+        warmup_options=warmup_options(),
+        logging_options={
+            "level": settings.LOG_LEVEL,
+            "log_format": settings.LOG_FORMAT,
+            "debug_sample_rate": settings.LOG_DEBUG_SAMPLE_RATE
+        }
+    )
+    await worker_pool.start()
+
+async def stop_worker_pool():
+    global worker_pool
+    if worker_pool is not None:
+        await worker_pool.shutdown()
+        worker_pool = None
+
+async def run_on_worker(engine, method, *args):
+    """Await engine.<method>(*args) on the worker pool, or inline if no pool is running"""
+    if worker_pool is None:
+        return getattr(engine, method)(*args)
+    return await worker_pool.run(method, *args)
+
+async def start_micro_batcher():
+    global micro_batcher
+    engine = inference_engine
+    if not settings.MICRO_BATCHING_ENABLED or engine is None or micro_batcher is not None:
+        return
+    # Forward passes share the AUDIO_WORKERS pool (and its limits) with the rest of the pipeline
+    run_batch = None
+    if worker_pool is not None and worker_pool.mode != "inline":
+        run_batch = partial(worker_pool.run, 'predict_batch')
+    micro_batcher = MicroBatcher(
+        engine,
+        max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=settings.MICRO_BATCH_MAX_WAIT_MS,
+        run_batch=run_batch
+    )
+    await micro_batcher.start()
+
+async def stop_micro_batcher():
+    global micro_batcher
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+        micro_batcher = None
+
+async def predict_probability(engine, mfcc_normalized):
+    """Step 6 for one clip, via the micro-batcher when it is running"""
+    if micro_batcher is not None and micro_batcher.running:
+        return await micro_batcher.submit(mfcc_normalized)
+    return await run_on_worker(engine, 'predict', mfcc_normalized)
+
+async def predict_and_build(engine, features, start_time):
+    """Steps 6-7 for extracted features, via the micro-batcher when it is running"""
+    import time
+    
+    step6_start = time.time()
+    probability = await predict_probability(engine, features['mfcc_normalized'])
+    step6_time = (time.time() - step6_start) * 1000
+    
+    return engine.build_result(features, probability, step6_time, start_time)
+
+async def run_audio_pipeline(engine, content, suffix):
+    """Run the full pipeline on uploaded bytes, routing the forward pass through the micro-batcher when it is running"""
+    import time
+    
+    if micro_batcher is None or not micro_batcher.running:
+        return await run_on_worker(engine, 'process_bytes', content, suffix)
+    
+    start_time = time.time()
+    try:
+        features = await run_on_worker(engine, 'extract_features_from_bytes', content, suffix)
+        return await predict_and_build(engine, features, start_time)
+    except Exception as e:
+        return engine.error_result(e, start_time)
+
+async def run_streaming_pipeline(engine, chunks):
+    """Featurize a WAV upload chunk by chunk as it arrives, then predict once the stream ends"""
+    import time
+    
+    start_time = time.time()
+    session = engine.create_stream_session()
+    received = 0
+    try:
+        async for chunk in chunks:
+            if chunk:
+                received += len(chunk)
+                if received > settings.STREAM_MAX_BODY_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Streamed uploads are limited to {settings.STREAM_MAX_BODY_BYTES} bytes")
+                # DSP for this chunk runs off the event loop; on /analyze/stream the next chunk is
+                # still being received meanwhile (an UploadFile has already been fully spooled)
+                await asyncio.to_thread(session.feed, chunk)
+        
+        features = await asyncio.to_thread(engine.extract_features_from_stream, session)
+        return await predict_and_build(engine, features, start_time)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return engine.error_result(e, start_time)
+
+async def iter_upload_chunks(file, chunk_size):
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.ogg')
+
+def engine_unavailable_response(endpoint):
+    ANALYSIS_ERRORS.inc(endpoint=endpoint, reason="system_unavailable")
+    return {
+        "error": "Analysis system initializing or unavailable",
+        "risk_level": "SYSTEM UNAVAILABLE",
+        "confidence": 0,
+        "recommendation": "System is currently unable to process audio. Please try again in a few moments.",
+        "color": "gray"
+    }
+
+def record_analysis(engine, endpoint, result):
+    """Feed one freshly computed (not cached) pipeline result into the metrics registry"""
+    if "error" in result:
+        ANALYSIS_ERRORS.inc(endpoint=endpoint, reason="pipeline_error")
+        return
+    for stage, elapsed_ms in result.get("pipeline_timing", {}).items():
+        PIPELINE_STAGE_MS.observe(elapsed_ms, stage=stage.removesuffix("_ms"))
+    ANALYSIS_PROCESSING_MS.observe(result.get("processing_time_ms", 0), endpoint=endpoint)
+    ANALYSIS_RESULTS.inc(endpoint=endpoint, risk_level=result["risk_level"])
+    if engine.model is None:
+        ANALYSIS_FALLBACKS.inc(endpoint=endpoint, mode="acoustic_only")
+
+def get_upstream_pool():
+    global upstream_pool
+    if upstream_pool is None:
+        upstream_pool = UpstreamPool(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+            connect_timeout=settings.UPSTREAM_CONNECT_TIMEOUT_SECONDS,
+            pool_timeout=settings.UPSTREAM_POOL_TIMEOUT_SECONDS,
+            timeouts={"openaq": settings.OPENAQ_TIMEOUT_SECONDS, "gemini": settings.GEMINI_TIMEOUT_SECONDS},
+            http2=settings.UPSTREAM_HTTP2
+        )
+        upstream_pool.start()
+    return upstream_pool
+
+async def close_upstream_pool():
+    global upstream_pool
+    if upstream_pool is not None:
+        await upstream_pool.close()
+        upstream_pool = None
+
+async def upstream_request(upstream, method, url, **kwargs):
+    """Pooled request + raise_for_status(), with the latency recorded per upstream and outcome"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await get_upstream_pool().request(upstream, method, url, **kwargs)
+        outcome = "ok" if response.is_success else f"http_{response.status_code}"
+        response.raise_for_status()
+        return response
+    except httpx.TimeoutException:
+        outcome = "timeout"
+        raise
+    finally:
+        UPSTREAM_REQUEST_MS.observe((time.perf_counter() - start) * 1000, upstream=upstream, outcome=outcome)
+
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+PROFILE_FILES = {"speedscope": "speedscope.json", "chrome-trace": "forward_trace.json"}
+
+def admin_authorized(request):
+    """Profiling must be enabled; X-Admin-Token must match when PROFILING_ADMIN_TOKEN is set"""
+    if not settings.PROFILING_ENABLED:
+        return False
+    if not settings.PROFILING_ADMIN_TOKEN:
+        return True
+    return secrets.compare_digest(request.headers.get("x-admin-token", ""), settings.PROFILING_ADMIN_TOKEN)
+
+def profiling_requested(request):
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    return flag in ("1", "true") and admin_authorized(request)
+
+def run_profiled(engine, content, suffix):
+    """Whole pipeline for one upload under the stack sampler + torch.profiler (blocking; run off the loop)"""
+    from profiling import profile_bytes, prune_profiles
+    request_id = re.sub(r"[^A-Za-z0-9_-]", "", current_request_id() or "")[:16] or secrets.token_hex(4)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{request_id}"
+    result, summary = profile_bytes(
+        engine, content, suffix, os.path.join(settings.PROFILING_DIR, profile_id),
+        interval_ms=settings.PROFILING_SAMPLE_INTERVAL_MS
+    )
+    prune_profiles(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
+    summary["downloads"] = {
+        kind: f"/admin/profiles/{profile_id}/{kind}" for kind, file_name in PROFILE_FILES.items()
+        if file_name in summary["files"]
+    }
+    return {**result, "profile": summary}
+
+def pipeline_error_response(result):
+    return {
+        "error": result["error"],
+        "risk_level": "ERROR",
+        "confidence": 0,
+        "recommendation": "The audio quality was insufficient for analysis. Please record in a quieter environment.",
+        "color": "gray",
+        "processing_time_ms": result.get("processing_time_ms", 0)
+    }
 
 @router.post("/analyze")
-async def analyze_audio(file: UploadFile = File(...)):
+async def analyze_audio(request: Request, file: UploadFile = File(...)):
     """Analyze urban acoustic audio file for health sentinel mapping"""
     
     # Validate file type
-    if not file.filename.endswith(('.wav', '.mp3', '.m4a', '.ogg')):
+    if not file.filename.endswith(AUDIO_EXTENSIONS):
         raise HTTPException(status_code=400, detail="Only audio files (.wav, .mp3, .m4a, .ogg) are supported")
     
     # Get inference engine (should be initialized already)
-    engine = get_inference_engine()
+    engine = await acquire_inference_engine()
     if engine is None:
         # If engine is STILL None, we have a code import issue, but we handles this gracefully
+        return engine_unavailable_response("analyze")
+    
+    try:
+        suffix = os.path.splitext(file.filename)[1]
+        
+        if settings.STREAMING_INGESTION_ENABLED and suffix.lower() == '.wav':
+            # Incremental feature extraction from the spooled upload: bounded memory, no transfer overlap
+            result = await run_streaming_pipeline(engine, iter_upload_chunks(file, settings.STREAM_CHUNK_BYTES))
+            cache_key = None
+        else:
+            content = await file.read()
+            
+            if profiling_requested(request):
+                # Profiled runs bypass the result cache, worker pool and micro-batcher so every step is captured
+                result = await asyncio.to_thread(run_profiled, engine, content, suffix)
+                record_analysis(engine, "analyze", result)
+                if "error" in result:
+                    return pipeline_error_response(result)
+                return {**result, "cache_hit": False}
+            
+            # Repeated uploads (client retries, gateway re-forwards) skip decoding and inference
+            cache = get_result_cache()
+            cache_key = result_cache_key(engine, content) if cache is not None else None
+            if cache_key is not None:
+                cached = await cache_call(cache, "get", cache_key)
+                if cached is not None:
+                    return {**cached, "cache_hit": True}
+            
+            # Decode straight from the uploaded bytes (no temp file round-trip)
+            result = await run_audio_pipeline(engine, content, suffix)
+        record_analysis(engine, "analyze", result)
+        
+        # Check if internal error occurred in pipeline
+        if "error" in result:
+            return pipeline_error_response(result)
+        
+        if cache_key is not None:
+            await cache_call(get_result_cache(), "set", cache_key, result)
+        return {**result, "cache_hit": False}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_event(logging.ERROR, "analysis_endpoint_crash", endpoint="analyze", error=str(e))
+        ANALYSIS_ERRORS.inc(endpoint="analyze", reason="exception")
         return {
-            "error": "Analysis system initializing or unavailable",
-            "risk_level": "SYSTEM UNAVAILABLE",
+            "error": str(e),
+            "risk_level": "ERROR",
             "confidence": 0,
-            "recommendation": "System is currently unable to process audio. Please try again in a few moments.",
+            "recommendation": "An unexpected error occurred during processing. Please try again.",
             "color": "gray"
         }
+
+@router.post("/analyze/stream")
+async def analyze_audio_stream(request: Request):
+    """Analyze a raw WAV request body, extracting features while the upload is still arriving"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in ("audio/wav", "audio/x-wav", "audio/wave", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Streaming analysis expects a raw WAV body (Content-Type: audio/wav)")
     
-    # Save uploaded file temporarily
-    import tempfile
-    import os
+    engine = await acquire_inference_engine()
+    if engine is None:
+        return engine_unavailable_response("analyze_stream")
+    
+    result = await run_streaming_pipeline(engine, request.stream())
+    record_analysis(engine, "analyze_stream", result)
+    if "error" in result:
+        return pipeline_error_response(result)
+    return result
+
+@router.websocket("/ws/screening")
+async def live_screening(websocket: WebSocket, sample_rate: int = 16000, encoding: str = "pcm_s16le"):
+    """
+    Live screening over a PCM stream. Send binary messages of mono PCM
+    (pcm_s16le or f32le at `sample_rate`); every hop the server replies with
+    the rolling SentinelNet probability and calibrated risk for the last
+    LIVE_WINDOW_SECONDS of audio. Send {"type": "stop"} to end the session.
+    """
+    global live_sessions
+    await websocket.accept()
+    
+    engine = await acquire_inference_engine()
+    if engine is None:
+        await websocket.send_json({"type": "error", **engine_unavailable_response("ws_screening")})
+        await websocket.close(code=1013)
+        return
+    if live_sessions >= settings.LIVE_MAX_SESSIONS:
+        await websocket.send_json({"type": "error", "error": "Too many live sessions, try again shortly"})
+        await websocket.close(code=1013)
+        return
     
-    tmp_path = None
     try:
-        suffix = os.path.splitext(file.filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+        session = engine.create_live_session(
+            input_sr=sample_rate,
+            encoding=encoding,
+            window_seconds=settings.LIVE_WINDOW_SECONDS,
+            hop_seconds=settings.LIVE_HOP_SECONDS
+        )
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=1003)
+        return
+    
+    live_sessions += 1
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = {}
+                if isinstance(control, dict) and control.get("type") == "stop":
+                    await websocket.close()
+                    break
+                continue
+            
+            snapshots = await asyncio.to_thread(session.feed, message.get("bytes") or b"")
+            for mfcc, stats, t in snapshots:
+                probability = await predict_probability(engine, engine.normalize_features(mfcc))
+                risk = engine.calibrate_risk(probability, engine.audio_processor.score_acoustic_stats(stats))
+                ANALYSIS_RESULTS.inc(endpoint="ws_screening", risk_level=risk["risk_level"])
+                await websocket.send_json({
+                    "type": "prediction",
+                    "t": t,
+                    "window_seconds": settings.LIVE_WINDOW_SECONDS,
+                    "probability": round(probability, 4),
+                    **risk
+                })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_sessions -= 1
+
+@router.post("/analyze/batch")
+async def analyze_audio_batch(files: List[UploadFile] = File(...)):
+    """Analyze several audio files with a single batched SentinelNet forward pass"""
+    import time
+    
+    if len(files) > settings.MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {settings.MAX_BATCH_FILES} files can be analyzed per batch")
+    for file in files:
+        if not file.filename.endswith(AUDIO_EXTENSIONS):
+            raise HTTPException(status_code=400, detail=f"Unsupported file '{file.filename}'. Only audio files (.wav, .mp3, .m4a, .ogg) are supported")
+    
+    engine = await acquire_inference_engine()
+    if engine is None:
+        return engine_unavailable_response("analyze_batch")
+    
+    start_time = time.time()
+    try:
+        items = [(await file.read(), os.path.splitext(file.filename)[1]) for file in files]
         
-        # Process audio
-        result = engine.process_audio(tmp_path)
+        # Serve repeats from the result cache; only misses go through the model
+        cache = get_result_cache()
+        cache_keys = [result_cache_key(engine, content) for content, _ in items] if cache is not None else [None] * len(items)
+        results = await cache_call(cache, "get_many", cache_keys) if cache is not None else [None] * len(items)
+        cache_hits = [result is not None for result in results]
         
-        # Check if internal error occurred in pipeline
-        if "error" in result:
-             return {
-                "error": result["error"],
-                "risk_level": "ERROR",
-                "confidence": 0,
-                "recommendation": "The audio quality was insufficient for analysis. Please record in a quieter environment.",
-                "color": "gray",
-                "processing_time_ms": result.get("processing_time_ms", 0)
-            }
-            
-        return result
+        misses = [i for i, hit in enumerate(cache_hits) if not hit]
+        if misses:
+            # Process all uncached files through one forward pass
+            computed = await run_on_worker(engine, 'process_bytes_batch', [items[i] for i in misses])
+            for i, result in zip(misses, computed):
+                results[i] = result
+                record_analysis(engine, "analyze_batch", result)
+                if cache is not None and "error" not in result:
+                    await cache_call(cache, "set", cache_keys[i], result)
         
+        response_items = []
+        for file, result, hit in zip(files, results, cache_hits):
+            item = pipeline_error_response(result) if "error" in result else {**result, "cache_hit": hit}
+            response_items.append({"filename": file.filename, **item})
+        
+        return {
+            "batch_size": len(files),
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+            "results": response_items
+        }
+    
     except Exception as e:
-        print(f"[ERROR] Analysis endpoint crash: {e}")
+        log_event(logging.ERROR, "analysis_endpoint_crash", endpoint="analyze_batch", error=str(e))
+        ANALYSIS_ERRORS.inc(endpoint="analyze_batch", reason="exception")
         return {
             "error": str(e),
             "risk_level": "ERROR",
@@ -112,13 +694,179 @@ async def analyze_audio(file: UploadFile = File(...)):
             "recommendation": "An unexpected error occurred during processing. Please try again.",
             "color": "gray"
         }
-    finally:
-        # Clean up temp file
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except:
-                pass
+
+@router.get("/health/live")
+async def liveness():
+    """The process is up and serving HTTP (the engine may still be loading)"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def readiness(response: Response):
+    """200 once startup (engine load + warm-up) finished with a loaded engine, 503 before that; includes the startup breakdown"""
+    ready = startup_report.finished and inference_engine is not None
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else ("unavailable" if startup_report.finished else "starting"),
+        "startup_mode": settings.STARTUP_MODE,
+        "startup": startup_report.as_dict()
+    }
+
+def service_metrics_collector():
+    """Scrape-time gauges/counters bridged from startup, the engine, the micro-batcher and the result cache"""
+    ready = startup_report.finished and inference_engine is not None
+    families = [
+        MetricFamily("urbanvoice_ready", "gauge", "1 once startup and warm-up finished with a loaded engine").add(int(ready)),
+        MetricFamily("urbanvoice_live_sessions", "gauge", "Open live screening WebSockets").add(live_sessions)
+    ]
+    if startup_report.finished:
+        families.append(MetricFamily("urbanvoice_startup_ms", "gauge", "App import to end of startup in ms")
+                        .add(startup_report.ready_after_ms))
+    if startup_report.warmup:
+        families.append(MetricFamily("urbanvoice_warmup_ms", "gauge", "Warm-up duration in ms")
+                        .add(startup_report.warmup["duration_ms"]))
+    
+    engine = inference_engine
+    if engine is not None:
+        backend = engine.backend.name if engine.backend is not None else "none"
+        families.append(MetricFamily("urbanvoice_engine_info", "gauge", "Loaded inference engine").add(
+            1, model_version=engine.model_version, backend=backend, acoustic_only=str(engine.model is None).lower()
+        ))
+        families.append(MetricFamily(
+            "urbanvoice_inference_backend_fallback", "gauge", "1 if INFERENCE_BACKEND could not be built and another is serving"
+        ).add(int(engine.model is not None and backend != settings.INFERENCE_BACKEND)))
+    
+    if micro_batcher is not None:
+        families.extend([
+            MetricFamily("urbanvoice_microbatch_queue_depth", "gauge", "Predictions waiting for a batch")
+                .add(micro_batcher.stats()["queue_depth"]),
+            MetricFamily("urbanvoice_microbatch_batches_total", "counter", "Forward passes run by the micro-batcher")
+                .add(micro_batcher.total_batches),
+            histogram_family("urbanvoice_microbatch_size", "Clips per micro-batched forward pass",
+                             micro_batcher.batch_size_histogram, micro_batcher.total_items),
+            histogram_family("urbanvoice_microbatch_wait_ms", "Time a prediction waited for its batch in ms",
+                             micro_batcher.wait_ms_histogram, micro_batcher.wait_ms_sum)
+        ])
+    
+    if result_cache is not None:
+        memory = result_cache.memory.stats()
+        families.extend([
+            MetricFamily("urbanvoice_result_cache_lookups_total", "counter", "Result cache (memory tier) lookups")
+                .add(memory["hits"], result="hit").add(memory["misses"], result="miss"),
+            MetricFamily("urbanvoice_result_cache_evictions_total", "counter", "Result cache (memory tier) evictions")
+                .add(memory["evictions"]),
+            MetricFamily("urbanvoice_result_cache_entries", "gauge", "Result cache (memory tier) entries")
+                .add(memory["entries"])
+        ])
+    
+    if air_quality_cache is not None:
+        memory = air_quality_cache.memory.stats()
+        tier_lookups = MetricFamily(
+            "urbanvoice_air_quality_cache_tier_lookups_total", "counter",
+            "Air-quality cache lookups per tier (entries kept past the TTL for stale serving count as hits)"
+        ).add(memory["hits"], tier="memory", result="hit").add(memory["misses"], tier="memory", result="miss")
+        if air_quality_cache.disk is not None:
+            tier_lookups.add(air_quality_cache.disk.hits, tier="disk", result="hit")
+            tier_lookups.add(air_quality_cache.disk.misses, tier="disk", result="miss")
+        families.extend([
+            tier_lookups,
+            MetricFamily("urbanvoice_air_quality_cache_evictions_total", "counter", "Air-quality cache (memory tier) LRU evictions")
+                .add(memory["evictions"]),
+            MetricFamily("urbanvoice_air_quality_cache_entries", "gauge", "Air-quality cache (memory tier) entries")
+                .add(memory["entries"])
+        ])
+    
+    if air_quality_prefetcher is not None:
+        prefetch = air_quality_prefetcher.stats()
+        families.extend([
+            MetricFamily("urbanvoice_air_quality_prefetch_refreshes_total", "counter",
+                         "Hot air-quality locations refreshed ahead of expiry").add(prefetch["refreshes"]),
+            MetricFamily("urbanvoice_air_quality_prefetch_budget_exhausted_total", "counter",
+                         "Prefetch passes cut short by AIR_QUALITY_PREFETCH_MAX_PER_MINUTE").add(prefetch["skipped_budget"]),
+            MetricFamily("urbanvoice_air_quality_prefetch_hot_keys", "gauge", "Locations currently kept warm")
+                .add(len(prefetch["hot_keys"]))
+        ])
+    
+    flights = air_quality_flights.stats()
+    families.append(
+        MetricFamily("urbanvoice_air_quality_fetches_total", "counter",
+                     "Air-quality upstream fetches by kind (coalesced = cache miss that joined a fetch in flight)")
+            .add(flights["fetches"], kind="miss").add(flights["coalesced"], kind="coalesced")
+            .add(flights["refreshes"], kind="refresh").add(flights["refresh_failures"], kind="refresh_failed")
+    )
+    
+    if upstream_pool is not None:
+        pool = upstream_pool.stats()
+        families.extend([
+            MetricFamily("urbanvoice_upstream_in_flight", "gauge", "Upstream requests in flight")
+                .add(pool["in_flight_total"]),
+            MetricFamily("urbanvoice_upstream_pool_utilization", "gauge", "In-flight upstream requests / max connections")
+                .add(pool["utilization"]),
+            MetricFamily("urbanvoice_upstream_pool_connections", "gauge", "Open upstream connections in the pool")
+                .add(pool["open_connections"] - pool["idle_connections"], state="active")
+                .add(pool["idle_connections"], state="idle"),
+            MetricFamily("urbanvoice_upstream_connections_opened_total", "counter",
+                         "New TCP connections to upstreams (low relative to requests = connections reused)")
+        ])
+        for upstream, opened in pool["connections_opened"].items():
+            families[-1].add(opened, upstream=upstream)
+    return families
+
+metrics_registry.register_collector(service_metrics_collector)
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of pipeline latencies, errors/fallbacks, caches and upstream calls"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+@router.get("/admin/profiles")
+async def get_profiles(request: Request):
+    """Stored /analyze profiles, newest first"""
+    if not admin_authorized(request):
+        raise HTTPException(status_code=404, detail="Not found")
+    from profiling import list_profiles
+    return {"profiles": await asyncio.to_thread(list_profiles, settings.PROFILING_DIR)}
+
+@router.get("/admin/profiles/{profile_id}/{kind}")
+async def download_profile(request: Request, profile_id: str, kind: str):
+    """speedscope (open at https://www.speedscope.app) or chrome-trace (chrome://tracing, Perfetto) file"""
+    if not admin_authorized(request) or not PROFILE_ID_PATTERN.match(profile_id) or kind not in PROFILE_FILES:
+        raise HTTPException(status_code=404, detail="Not found")
+    path = os.path.join(settings.PROFILING_DIR, profile_id, PROFILE_FILES[kind])
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}-{PROFILE_FILES[kind]}")
+
+@router.get("/metrics/result-cache")
+async def get_result_cache_metrics():
+    """Hit/miss counters for the /analyze result cache"""
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await cache_call(cache, "stats")}
+
+@router.get("/metrics/air-quality-cache")
+async def get_air_quality_cache_metrics():
+    """Hit/miss/eviction counters for the air-quality cache tiers and single-flight fetches"""
+    return {
+        **await cache_call(get_air_quality_cache(), "stats"),
+        "fetches": air_quality_flights.stats(),
+        "prefetch": air_quality_prefetcher.stats() if air_quality_prefetcher is not None else {"running": False}
+    }
+
+@router.get("/metrics/batching")
+async def get_batching_metrics():
+    """Micro-batcher queue depth, batch size histogram and wait times"""
+    if micro_batcher is None:
+        return {"running": False, "enabled": settings.MICRO_BATCHING_ENABLED}
+    return {"enabled": True, **micro_batcher.stats()}
+
+@router.get("/metrics/upstream")
+async def get_upstream_metrics():
+    """Upstream connection pool: in-flight requests, open/idle connections, new connections per upstream"""
+    if upstream_pool is None:
+        return {"running": False}
+    return upstream_pool.stats()
 
 @router.get("/data")
 async def get_data():
@@ -136,44 +884,93 @@ async def get_data():
         "layer": "Sentinel Neural Infrastructure Layer"
     }
 
+async def fetch_air_quality(location_id):
+    """One OpenAQ call for location_id; stores the result in air_quality_cache"""
+    latest_url = f"{settings.OPENAQ_BASE_URL}/locations/{location_id}/latest"
+    latest_response = await upstream_request("openaq", "GET", latest_url, headers={"X-API-Key": settings.OPENAQ_API_KEY})
+    latest_data = latest_response.json()
+    await cache_call(get_air_quality_cache(), "set", f"location_{location_id}", latest_data)
+    return latest_data
+
+def log_refresh_failure(cache_key, error):
+    log_event(logging.WARNING, "air_quality_refresh_failed", cache_key=cache_key, error=str(error))
+
+async def cancel_air_quality_fetches():
+    await air_quality_flights.cancel_all()
+
+async def air_quality_entry_age(location_id):
+    entry = await cache_call(get_air_quality_cache(), "peek", f"location_{location_id}")
+    return time.time() - entry[1] if entry is not None else None
+
+def start_air_quality_refresh(location_id):
+    """Background fetch for location_id unless one is already in flight; True if one was started"""
+    cache_key = f"location_{location_id}"
+    if air_quality_flights.in_flight(cache_key):
+        return False
+    air_quality_flights.refresh(cache_key, lambda: fetch_air_quality(location_id), on_error=log_refresh_failure)
+    return True
+
+async def start_air_quality_prefetcher():
+    global air_quality_prefetcher
+    if not settings.AIR_QUALITY_PREFETCH_ENABLED:
+        return
+    air_quality_prefetcher = PrefetchScheduler(
+        start_air_quality_refresh,
+        air_quality_entry_age,
+        ttl_seconds=CACHE_DURATION,
+        top_n=settings.AIR_QUALITY_PREFETCH_TOP_N,
+        refresh_ahead=settings.AIR_QUALITY_PREFETCH_REFRESH_AHEAD,
+        jitter=settings.AIR_QUALITY_PREFETCH_JITTER,
+        max_refreshes_per_minute=settings.AIR_QUALITY_PREFETCH_MAX_PER_MINUTE,
+        interval_seconds=settings.AIR_QUALITY_PREFETCH_INTERVAL_SECONDS
+    )
+    await air_quality_prefetcher.start()
+
+async def stop_air_quality_prefetcher():
+    global air_quality_prefetcher
+    if air_quality_prefetcher is not None:
+        await air_quality_prefetcher.stop()
+        air_quality_prefetcher = None
+
 @router.get("/air-quality")
 async def get_air_quality(location_id: int = 5574):
     """Proxy endpoint for OpenAQ API to avoid CORS issues - with caching"""
-    import time
+    if air_quality_prefetcher is not None:
+        air_quality_prefetcher.record(location_id)
     
     # Check cache first
     cache_key = f"location_{location_id}"
-    if cache_key in air_quality_cache and air_quality_cache[cache_key]["timestamp"]:
-        if time.time() - air_quality_cache[cache_key]["timestamp"] < CACHE_DURATION:
-            return air_quality_cache[cache_key]["data"]
-    
-    api_key = settings.OPENAQ_API_KEY
-    latest_url = f"https://api.openaq.org/v3/locations/{location_id}/latest"
+    cached = await cache_call(get_air_quality_cache(), "get_entry", cache_key, min_stored_at=time.time() - CACHE_DURATION)
+    if cached is not None:
+        data, stored_at = cached
+        age = time.time() - stored_at
+        if age < CACHE_DURATION:
+            AIR_QUALITY_CACHE_LOOKUPS.inc(result="hit")
+            return data
+        if age < CACHE_DURATION + settings.AIR_QUALITY_STALE_WHILE_REVALIDATE_SECONDS:
+            # Serve the expired value now; a single background fetch refreshes it
+            AIR_QUALITY_CACHE_LOOKUPS.inc(result="revalidate")
+            air_quality_flights.refresh(cache_key, lambda: fetch_air_quality(location_id), on_error=log_refresh_failure)
+            return data
+    AIR_QUALITY_CACHE_LOOKUPS.inc(result="miss")
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            latest_response = await client.get(latest_url, headers={"X-API-Key": api_key})
-            latest_response.raise_for_status()
-            latest_data = latest_response.json()
-            
-            # Cache and return the data
-            if cache_key not in air_quality_cache:
-                air_quality_cache[cache_key] = {}
-            air_quality_cache[cache_key]["data"] = latest_data
-            air_quality_cache[cache_key]["timestamp"] = time.time()
-            return latest_data
-            
+        # Concurrent misses for the same location share one upstream call
+        return await air_quality_flights.do(cache_key, lambda: fetch_air_quality(location_id))
+        
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 429:
             # Return cached data if available, even if expired
-            if cache_key in air_quality_cache and air_quality_cache[cache_key].get("data"):
-                return air_quality_cache[cache_key]["data"]
+            if cached is not None:
+                AIR_QUALITY_CACHE_LOOKUPS.inc(result="stale")
+                return cached[0]
             raise HTTPException(status_code=429, detail="Rate limit exceeded. Please try again in a moment.")
         raise HTTPException(status_code=e.response.status_code, detail=f"OpenAQ API error: {str(e)}")
     except Exception as e:
         # Return cached data if available on any error
-        if cache_key in air_quality_cache and air_quality_cache[cache_key].get("data"):
-            return air_quality_cache[cache_key]["data"]
+        if cached is not None:
+            AIR_QUALITY_CACHE_LOOKUPS.inc(result="stale")
+            return cached[0]
         raise HTTPException(status_code=500, detail=f"Failed to fetch air quality data: {str(e)}")
 
 
@@ -203,31 +1000,30 @@ Please provide:
 Keep the report concise (200-250 words), professional, and actionable. Use a warm, supportive tone."""
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent",
-                headers={
-                    "x-goog-api-key": gemini_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
+        response = await upstream_request(
+            "gemini", "POST",
+            f"{settings.GEMINI_BASE_URL}/models/gemini-2.5-flash:generateContent",
+            headers={
+                "x-goog-api-key": gemini_api_key,
+                "Content-Type": "application/json"
+            },
+            json={
+                "contents": [{
+                    "parts": [{
+                        "text": prompt
                     }]
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
+                }]
+            }
+        )
+        data = response.json()
+        
+        # Extract generated text from Gemini response
+        if data.get('candidates') and len(data['candidates']) > 0:
+            report_text = data['candidates'][0]['content']['parts'][0]['text']
+            return {"report": report_text}
+        else:
+            raise HTTPException(status_code=500, detail="No response from Gemini AI")
             
-            # Extract generated text from Gemini response
-            if data.get('candidates') and len(data['candidates']) > 0:
-                report_text = data['candidates'][0]['content']['parts'][0]['text']
-                return {"report": report_text}
-            else:
-                raise HTTPException(status_code=500, detail="No response from Gemini AI")
-                
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail=f"Gemini API error: {str(e)}")
     except Exception as e:
@@ -256,30 +1052,30 @@ Keep responses concise (2-3 sentences), friendly, and informative. Always remind
     prompt = f"{system_context}\n\nUser question: {request.message}\n\nResponse:"
     
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.post(
-                "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent",
-                headers={
-                    "x-goog-api-key": gemini_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
+        response = await upstream_request(
+            "gemini", "POST",
+            f"{settings.GEMINI_BASE_URL}/models/gemini-2.5-flash:generateContent",
+            headers={
+                "x-goog-api-key": gemini_api_key,
+                "Content-Type": "application/json"
+            },
+            read_timeout=settings.GEMINI_CHAT_TIMEOUT_SECONDS,
+            json={
+                "contents": [{
+                    "parts": [{
+                        "text": prompt
                     }]
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
+                }]
+            }
+        )
+        data = response.json()
+        
+        if data.get('candidates') and len(data['candidates']) > 0:
+            response_text = data['candidates'][0]['content']['parts'][0]['text']
+            return {"response": response_text}
+        else:
+            raise HTTPException(status_code=500, detail="No response from AI")
             
-            if data.get('candidates') and len(data['candidates']) > 0:
-                response_text = data['candidates'][0]['content']['parts'][0]['text']
-                return {"response": response_text}
-            else:
-                raise HTTPException(status_code=500, detail="No response from AI")
-                
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail=f"AI API error: {str(e)}")
     except Exception as e:
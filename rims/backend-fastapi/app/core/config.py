@@ -9,6 +9,116 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = ""
     OPENAQ_API_KEY: str = ""
     
+    # Upstream API base URLs (point these at local stubs for load tests, see load_test.py)
+    OPENAQ_BASE_URL: str = "https://api.openaq.org/v3"
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
+    
+    # Shared keep-alive connection pool for upstream calls; read timeouts are per upstream
+    # (chat uses GEMINI_CHAT_TIMEOUT_SECONDS), connect/pool-acquire timeouts are shared
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    UPSTREAM_POOL_TIMEOUT_SECONDS: float = 5.0
+    UPSTREAM_HTTP2: bool = False
+    OPENAQ_TIMEOUT_SECONDS: float = 10.0
+    GEMINI_TIMEOUT_SECONDS: float = 30.0
+    GEMINI_CHAT_TIMEOUT_SECONDS: float = 20.0
+    
+    # "blocking": serve only after the engine is loaded; "background": serve /health/live at once and
+    # load the engine in the background (/health/ready returns 503 until it is up)
+    STARTUP_MODE: str = "blocking"
+    # After a failed engine load, an analysis request retries it at most this often, doubling up to the max
+    ENGINE_RETRY_BACKOFF_SECONDS: float = 5.0
+    ENGINE_RETRY_MAX_BACKOFF_SECONDS: float = 300.0
+    
+    # Warm-up before reporting ready: synthetic clips at each batch size until request p99 settles
+    WARMUP_ENABLED: bool = True
+    WARMUP_BATCH_SIZES: str = "1,8,32"
+    WARMUP_MAX_ROUNDS: int = 6
+    WARMUP_P99_TOLERANCE: float = 0.2
+    
+    # Structured logging: LOG_FORMAT "json" or "text"; LOG_DEBUG_SAMPLE_RATE = fraction of requests that
+    # get feature-level debug traces (LOG_LEVEL=DEBUG traces all of them)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.0
+    
+    # Opt-in per-request profiling of /analyze (X-Profile: 1 or ?profile=1); profiles are served from
+    # /admin/profiles. Requests and downloads must send X-Admin-Token when PROFILING_ADMIN_TOKEN is set.
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "profiles"
+    PROFILING_ADMIN_TOKEN: str = ""
+    PROFILING_SAMPLE_INTERVAL_MS: float = 1.0
+    PROFILING_MAX_PROFILES: int = 50
+    
+    # Air-quality cache: bounded in-process LRU, plus a SQLite file shared by all workers on the node
+    # when AIR_QUALITY_CACHE_DB_PATH is set (empty = memory tier only), trimmed to DB_MAX_ROWS
+    AIR_QUALITY_CACHE_TTL_SECONDS: int = 300
+    AIR_QUALITY_CACHE_MAX_ENTRIES: int = 512
+    AIR_QUALITY_CACHE_DB_PATH: str = ""
+    AIR_QUALITY_CACHE_DB_MAX_ROWS: int = 10000
+    
+    # Serve an expired air-quality entry for up to this long past its TTL while one background fetch
+    # refreshes it (0 = always wait for the upstream)
+    AIR_QUALITY_STALE_WHILE_REVALIDATE_SECONDS: int = 3600
+    # How long past its TTL an entry is kept as a fallback when OpenAQ fails or rate-limits
+    AIR_QUALITY_STALE_IF_ERROR_SECONDS: int = 86400
+    
+    # Background refresh of the most requested locations once they reach REFRESH_AHEAD x TTL (minus up to
+    # JITTER x TTL per location), capped at MAX_PER_MINUTE upstream calls
+    AIR_QUALITY_PREFETCH_ENABLED: bool = True
+    AIR_QUALITY_PREFETCH_TOP_N: int = 20
+    AIR_QUALITY_PREFETCH_REFRESH_AHEAD: float = 0.8
+    AIR_QUALITY_PREFETCH_JITTER: float = 0.1
+    AIR_QUALITY_PREFETCH_MAX_PER_MINUTE: int = 30
+    AIR_QUALITY_PREFETCH_INTERVAL_SECONDS: float = 5.0
+    
+    # Audio analysis
+    MAX_BATCH_FILES: int = 32
+    
+    # SentinelNet inference backend: "eager", "torchscript", "int8" or "onnx" (see ml/compare_backends.py)
+    INFERENCE_BACKEND: str = "eager"
+    
+    # ONNX Runtime backend (model is exported from the loaded weights if the file is missing)
+    ONNX_MODEL_PATH: str = "models/respira_net_v1.onnx"
+    ONNX_INTRA_OP_THREADS: int = 1
+    ONNX_INTER_OP_THREADS: int = 1
+    
+    # Content-addressed cache of /analyze results (empty DB path = memory tier only)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_TTL_SECONDS: int = 3600
+    RESULT_CACHE_DB_PATH: str = ""
+    RESULT_CACHE_DB_MAX_ROWS: int = 50000
+    
+    # Persistent MFCC/acoustic feature store keyed by audio hash (empty = disabled)
+    FEATURE_STORE_DIR: str = ""
+    
+    # Featurize WAV uploads on /analyze chunk by chunk from the spooled upload instead of reading them into
+    # memory (only bounds memory; DSP overlaps the network transfer on /analyze/stream alone). Experimental:
+    # streamed features skip the silence trim and gate against the running peak, so the same WAV can
+    # score differently than on the buffered path (measure with ml/compare_streaming.py before enabling)
+    STREAMING_INGESTION_ENABLED: bool = False
+    STREAM_CHUNK_BYTES: int = 64 * 1024
+    # Streamed bodies (/analyze/stream, streamed /analyze) larger than this are rejected with 413
+    STREAM_MAX_BODY_BYTES: int = 64 * 1024 * 1024
+    
+    # Live WebSocket screening
+    LIVE_WINDOW_SECONDS: float = 3.0
+    LIVE_HOP_SECONDS: float = 0.5
+    LIVE_MAX_SESSIONS: int = 64
+    
+    # Where the blocking audio pipeline runs: "inline", "thread" or "process"
+    AUDIO_EXECUTION_MODE: str = "thread"
+    AUDIO_WORKERS: int = 2
+    AUDIO_WORKER_TORCH_THREADS: int = 1
+    
+    # Micro-batching of concurrent /analyze forward passes
+    MICRO_BATCHING_ENABLED: bool = True
+    MICRO_BATCH_MAX_SIZE: int = 32
+    MICRO_BATCH_MAX_WAIT_MS: float = 5.0
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
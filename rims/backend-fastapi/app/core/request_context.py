@@ -0,0 +1,38 @@
+import uuid
+
+from pipeline_logging import start_request, end_request
+
+REQUEST_ID_HEADER = b"x-request-id"
+DEBUG_TRACE_HEADER = b"x-debug-trace"
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware binding a correlation ID to every HTTP request / WebSocket.
+
+    Uses the caller's X-Request-ID when present, echoes it on the response,
+    and lets X-Debug-Trace: 1 force feature-level debug traces for one
+    request (when tracing is configured at all).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        tokens = start_request(request_id, force_trace=headers.get(DEBUG_TRACE_HEADER) == b"1")
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            end_request(tokens)
@@ -1,17 +1,53 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import router as api_router, get_inference_engine
+import asyncio
+from app.api.endpoints import (
+    router as api_router,
+    initialize_services,
+    stop_worker_pool,
+    stop_micro_batcher,
+    close_result_cache,
+    get_upstream_pool,
+    close_upstream_pool,
+    cancel_air_quality_fetches,
+    close_air_quality_cache,
+    start_air_quality_prefetcher,
+    stop_air_quality_prefetcher,
+)
 from app.core.config import settings
+from app.core.request_context import RequestContextMiddleware
+from app.services.startup import STARTUP_MODES
+from pipeline_logging import configure_logging
+
+configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_DEBUG_SAMPLE_RATE)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Load the ML model on startup
-    print("Starting up: Initializing ML Inference Engine...")
-    get_inference_engine()
+    if settings.STARTUP_MODE not in STARTUP_MODES:
+        raise ValueError(f"Unknown STARTUP_MODE '{settings.STARTUP_MODE}', expected one of {STARTUP_MODES}")
+    get_upstream_pool()
+    await start_air_quality_prefetcher()
+    startup_task = None
+    if settings.STARTUP_MODE == "background":
+        print("Starting up: loading ML Inference Engine in the background...")
+        startup_task = asyncio.create_task(initialize_services())
+    else:
+        print("Starting up: Initializing ML Inference Engine...")
+        await initialize_services()
     yield
-    # Clean up on shutdown if needed
+    # Clean up on shutdown: let a background load finish, stop taking new batches, then drain the workers
     print("Shutting down...")
+    if startup_task is not None:
+        await startup_task
+    await stop_micro_batcher()
+    await stop_worker_pool()
+    close_result_cache()
+    await stop_air_quality_prefetcher()
+    await cancel_air_quality_fetches()
+    close_air_quality_cache()
+    await close_upstream_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -38,6 +74,9 @@ app.add_middleware(
 async def root():
     return {"message": f"Welcome to {settings.PROJECT_NAME}", "status": "online"}
 
+# Correlation ID for every request (outermost, so it also covers CORS preflights)
+app.add_middleware(RequestContextMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 # For backward compatibility with the current Express setup:
 app.include_router(api_router)
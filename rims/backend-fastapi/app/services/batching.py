@@ -0,0 +1,165 @@
+import asyncio
+import math
+import time
+
+# Histogram bucket upper bounds
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, math.inf)
+WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, math.inf)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-clip predictions into batched SentinelNet forward passes.
+
+    Callers submit a normalized [13, 100] MFCC and await its probability. A single
+    worker task collects pending items until either max_batch_size items are queued
+    or max_wait_ms has passed since the oldest one arrived, then runs them through
+    engine.predict_batch in one call and resolves every caller's future.
+
+    run_batch(mfccs) is an async callable that runs the forward pass (e.g. on the
+    audio worker pool); without one it goes to the loop's default executor.
+    """
+
+    def __init__(self, engine, max_batch_size=32, max_wait_ms=5.0, run_batch=None):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.run_batch = run_batch
+        self._queue = None
+        # Set on every submit; the collector waits on this (never on a timed queue.get(), whose
+        # cancellation can drop a just-dequeued item on Python <= 3.11)
+        self._arrived = None
+        self._worker = None
+        # Items taken off the queue but not yet resolved (collecting or in the forward pass)
+        self._batch = []
+
+        # Metrics
+        self.total_items = 0
+        self.total_batches = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.wait_ms_histogram = {bucket: 0 for bucket in WAIT_MS_BUCKETS}
+        self.wait_ms_sum = 0.0
+        self.wait_ms_max = 0.0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._arrived = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        print(f"[OK] Micro-batcher started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000:g})")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Fail anything still waiting or mid-batch so callers don't hang
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher shut down"))
+
+    async def submit(self, mfcc_normalized):
+        """Queue one normalized MFCC and wait for its model probability"""
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((mfcc_normalized, future, time.perf_counter()))
+        self._arrived.set()
+        return await future
+
+    async def _collect(self):
+        """Wait for the first item, then gather more until the batch is full or the window closes"""
+        while self._queue.empty():
+            self._arrived.clear()
+            await self._arrived.wait()
+        self._batch = batch = [self._queue.get_nowait()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            # Items are only ever taken with get_nowait(), so a timeout here cannot lose one
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self._record(batch)
+
+            try:
+                # Forward pass happens off the event loop so new requests keep queueing
+                mfccs = [mfcc for mfcc, _, _ in batch]
+                if self.run_batch is not None:
+                    probabilities = await self.run_batch(mfccs)
+                else:
+                    probabilities = await loop.run_in_executor(None, self.engine.predict_batch, mfccs)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._batch = []
+                continue
+
+            for (_, future, _), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(probability)
+            self._batch = []
+
+    def _record(self, batch):
+        now = time.perf_counter()
+        self.total_batches += 1
+        self.total_items += len(batch)
+        self.batch_size_histogram[_bucket(len(batch), BATCH_SIZE_BUCKETS)] += 1
+        for _, _, enqueued_at in batch:
+            wait_ms = (now - enqueued_at) * 1000
+            self.wait_ms_sum += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            self.wait_ms_histogram[_bucket(wait_ms, WAIT_MS_BUCKETS)] += 1
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "total_items": self.total_items,
+            "total_batches": self.total_batches,
+            "avg_batch_size": round(self.total_items / self.total_batches, 2) if self.total_batches else 0,
+            "batch_size_histogram": {f"le_{bucket}": count for bucket, count in self.batch_size_histogram.items()},
+            "wait_ms": {
+                "avg": round(self.wait_ms_sum / self.total_items, 3) if self.total_items else 0,
+                "max": round(self.wait_ms_max, 3),
+                "histogram": {f"le_{bucket}": count for bucket, count in self.wait_ms_histogram.items()}
+            }
+        }
+
+
+def _bucket(value, buckets):
+    """Smallest bucket bound >= value"""
+    for bound in buckets:
+        if value <= bound:
+            return bound
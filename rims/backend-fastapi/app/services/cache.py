@@ -0,0 +1,223 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Size-bounded in-process LRU cache whose entries expire after ttl_seconds"""
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        """Return (value, stored_at) or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry[1] >= self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key):
+        """(value, stored_at) even if expired, without touching counters or LRU order"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, value, stored_at=None):
+        with self._lock:
+            self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0
+        }
+
+
+class SQLiteCache:
+    """
+    On-disk JSON cache tier; one file can be shared by every worker process on a node.
+
+    Expired rows are deleted, and the table is trimmed to the max_rows most
+    recently stored, when it is opened and then every prune_every writes.
+
+    Every call is blocking disk I/O (and may wait up to 5s on another
+    process's write lock), so async callers run it via asyncio.to_thread.
+    """
+
+    def __init__(self, path, ttl_seconds=3600, table="cache", max_rows=10000, prune_every=256):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this only fsyncs at checkpoints; a crash can lose the last few cached writes, nothing else
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_stored_at ON {table} (stored_at)")
+        self._conn.commit()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        self.prune()
+
+    def get(self, key):
+        """Return (value, stored_at) or None if missing/expired"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def peek(self, key):
+        """(value, stored_at) even if expired, without touching counters"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row is not None else None
+
+    def set(self, key, value, stored_at=None):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), stored_at if stored_at is not None else time.time())
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._prune()
+
+    def prune(self):
+        """Delete expired rows, then the oldest rows beyond max_rows"""
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        deleted = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE stored_at < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        if self.max_rows:
+            deleted += self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,)
+            ).rowcount
+        self._conn.commit()
+        self.pruned += deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_rows": self.max_rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "pruned": self.pruned
+        }
+
+
+class TieredCache:
+    """In-process LRU/TTL tier in front of an optional shared SQLite tier"""
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, db_path=None, table="cache", db_max_rows=10000):
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.disk = SQLiteCache(db_path, ttl_seconds=ttl_seconds, table=table, max_rows=db_max_rows) if db_path else None
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def get_entry(self, key, min_stored_at=None):
+        """
+        Return (value, stored_at) or None. With min_stored_at, a memory entry
+        older than that is checked against the shared tier, which another
+        worker may have refreshed; the newer of the two is returned.
+        """
+        entry = self.memory.get_entry(key)
+        if self.disk is None or (entry is not None and (min_stored_at is None or entry[1] >= min_stored_at)):
+            return entry
+        disk_entry = self.disk.get(key)
+        if disk_entry is None or (entry is not None and disk_entry[1] <= entry[1]):
+            return entry
+        # Promote into the memory tier, keeping the original timestamp so TTL still holds
+        self.memory.set(key, disk_entry[0], stored_at=disk_entry[1])
+        return disk_entry
+
+    def peek(self, key):
+        """Newest (value, stored_at) across tiers, expired or not, without touching counters"""
+        entry = self.memory.peek(key)
+        disk_entry = self.disk.peek(key) if self.disk is not None else None
+        if entry is None or (disk_entry is not None and disk_entry[1] > entry[1]):
+            return disk_entry
+        return entry
+
+    def set(self, key, value, stored_at=None):
+        stored_at = stored_at if stored_at is not None else time.time()
+        self.memory.set(key, value, stored_at=stored_at)
+        if self.disk is not None:
+            self.disk.set(key, value, stored_at=stored_at)
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self):
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None
+        }
@@ -0,0 +1,71 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    At most one in-flight fetch per key; concurrent callers for the same key await the same result.
+
+    The fetch runs as its own task, so a caller that disconnects (and is
+    cancelled) does not cancel the fetch for everyone else waiting on it.
+    refresh() starts the same kind of fetch in the background without
+    waiting, for stale-while-revalidate.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+
+        # Metrics
+        self.fetches = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _start(self, key, fetch):
+        task = asyncio.ensure_future(fetch())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    async def do(self, key, fetch):
+        """Await fetch() for key, joining the fetch already in flight if there is one"""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.fetches += 1
+            task = self._start(key, fetch)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def refresh(self, key, fetch, on_error=None):
+        """Start fetch() for key in the background unless one is already in flight; returns the task"""
+        task = self._in_flight.get(key)
+        if task is not None:
+            return task
+        self.refreshes += 1
+        task = self._start(key, fetch)
+
+        def report(done):
+            if not done.cancelled() and done.exception() is not None:
+                self.refresh_failures += 1
+                if on_error is not None:
+                    on_error(key, done.exception())
+        task.add_done_callback(report)
+        return task
+
+    def in_flight(self, key):
+        return key in self._in_flight
+
+    async def cancel_all(self):
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._in_flight),
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures
+        }
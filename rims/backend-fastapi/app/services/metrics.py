@@ -0,0 +1,210 @@
+import math
+import threading
+
+# Latency buckets (ms) shared by the pipeline-stage and upstream histograms
+LATENCY_MS_BUCKETS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, math.inf)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, **extra):
+        return {**dict(zip(self.labelnames, key)), **extra}
+
+
+class Counter(_Metric):
+    """Monotonic counter; the name should end in _total"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with _bucket/_sum/_count series"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_MS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(set(buckets) | {math.inf}))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", self._labels(key, le=_format_value(bound)), cumulative))
+            samples.append((f"{self.name}_sum", self._labels(key), total))
+            samples.append((f"{self.name}_count", self._labels(key), cumulative))
+        return samples
+
+
+class MetricFamily:
+    """Metric computed at scrape time by a collector (e.g. bridged from a component's stats())"""
+
+    def __init__(self, name, kind, documentation):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self._samples = []
+
+    def add(self, value, suffix="", **labels):
+        self._samples.append((self.name + suffix, labels, value))
+        return self
+
+    def samples(self):
+        return self._samples
+
+
+def histogram_family(name, documentation, bucket_counts, total, **labels):
+    """MetricFamily for a histogram kept elsewhere as {upper bound: count in that bucket}"""
+    family = MetricFamily(name, "histogram", documentation)
+    cumulative = 0
+    for bound in sorted(bucket_counts):
+        cumulative += bucket_counts[bound]
+        family.add(cumulative, "_bucket", **labels, le=_format_value(bound))
+    family.add(total, "_sum", **labels)
+    family.add(cumulative, "_count", **labels)
+    return family
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics in the Prometheus text exposition format (no client library).
+
+    Counters and histograms are updated as requests run; collectors are
+    callables returning MetricFamily objects and run on every scrape, so
+    components that already keep their own stats (micro-batcher, caches)
+    are bridged without double bookkeeping.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_MS_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self):
+        families = list(self._metrics)
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"[WARN] Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {_escape(family.documentation)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+PIPELINE_STAGE_MS = registry.histogram(
+    "urbanvoice_pipeline_stage_ms", "Latency of each audio pipeline stage (pipeline_timing) in ms", ("stage",)
+)
+ANALYSIS_PROCESSING_MS = registry.histogram(
+    "urbanvoice_analysis_processing_ms", "End-to-end pipeline time per analyzed clip in ms", ("endpoint",)
+)
+ANALYSIS_RESULTS = registry.counter(
+    "urbanvoice_analysis_results_total", "Analyzed clips by risk level", ("endpoint", "risk_level")
+)
+ANALYSIS_ERRORS = registry.counter(
+    "urbanvoice_analysis_errors_total",
+    "Analysis requests that produced no prediction (pipeline_error, system_unavailable, exception)",
+    ("endpoint", "reason")
+)
+ANALYSIS_FALLBACKS = registry.counter(
+    "urbanvoice_analysis_fallbacks_total", "Clips scored in a degraded mode (acoustic_only)", ("endpoint", "mode")
+)
+AIR_QUALITY_CACHE_LOOKUPS = registry.counter(
+    "urbanvoice_air_quality_cache_lookups_total",
+    "Air-quality cache lookups (hit, miss, revalidate = expired entry served while it is refreshed, "
+    "stale = expired entry served after an upstream failure)",
+    ("result",)
+)
+UPSTREAM_REQUEST_MS = registry.histogram(
+    "urbanvoice_upstream_request_ms", "Latency of calls to external APIs in ms", ("upstream", "outcome")
+)
+
+
+def air_quality_cache_collector():
+    hits = AIR_QUALITY_CACHE_LOOKUPS.value(result="hit")
+    lookups = hits + AIR_QUALITY_CACHE_LOOKUPS.value(result="miss") + AIR_QUALITY_CACHE_LOOKUPS.value(result="revalidate")
+    return [MetricFamily(
+        "urbanvoice_air_quality_cache_hit_ratio", "gauge", "Fresh air-quality cache hits / lookups"
+    ).add(hits / lookups if lookups else 0)]
+
+
+registry.register_collector(air_quality_cache_collector)
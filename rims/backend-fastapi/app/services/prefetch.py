@@ -0,0 +1,139 @@
+import asyncio
+import math
+import random
+import time
+
+
+class PrefetchScheduler:
+    """
+    Keeps the most requested cache keys fresh from a background task.
+
+    record(key) is called on every request and bumps an exponentially
+    decaying popularity score. Every interval_seconds the top_n keys scoring
+    at least min_score are checked: one whose entry is missing, or older than
+    refresh_ahead * ttl_seconds minus a per-key random jitter, is refreshed
+    through start_refresh(key) (which returns False if a fetch for that key is
+    already running). entry_age(key) is awaited, so it can read a blocking
+    cache tier off the event loop. Refreshes are limited by a token bucket of
+    max_refreshes_per_minute so prefetching never eats the upstream rate limit.
+    """
+
+    def __init__(self, start_refresh, entry_age, ttl_seconds, top_n=20, min_score=2.0, refresh_ahead=0.8,
+                 jitter=0.1, max_refreshes_per_minute=30, interval_seconds=5.0, half_life_seconds=900.0):
+        self.start_refresh = start_refresh
+        self.entry_age = entry_age
+        self.ttl_seconds = ttl_seconds
+        self.top_n = top_n
+        self.min_score = min_score
+        self.refresh_ahead = refresh_ahead
+        self.jitter = jitter
+        self.max_refreshes_per_minute = max_refreshes_per_minute
+        self.interval = interval_seconds
+        self.half_life = half_life_seconds
+        self._scores = {}
+        self._jitter = {}
+        self._tokens = float(max_refreshes_per_minute)
+        self._tokens_at = time.monotonic()
+        self._worker = None
+
+        # Metrics
+        self.refreshes = 0
+        self.skipped_budget = 0
+        self.cycles = 0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    def record(self, key):
+        now = time.monotonic()
+        score, updated = self._scores.get(key, (0.0, now))
+        self._scores[key] = (self._decayed(score, updated, now) + 1, now)
+        if key not in self._jitter:
+            self._jitter[key] = random.uniform(0, self.jitter)
+
+    def _decayed(self, score, updated, now):
+        return score * math.pow(0.5, (now - updated) / self.half_life)
+
+    def hot_keys(self):
+        """Top keys by decayed request count, most popular first; drops keys that have gone cold"""
+        now = time.monotonic()
+        scored = []
+        for key, (score, updated) in list(self._scores.items()):
+            score = self._decayed(score, updated, now)
+            if score < 0.05:
+                del self._scores[key]
+                self._jitter.pop(key, None)
+            elif score >= self.min_score:
+                scored.append((score, key))
+        scored.sort(reverse=True)
+        return [key for _, key in scored[:self.top_n]]
+
+    def _take_token(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_refreshes_per_minute,
+                           self._tokens + (now - self._tokens_at) * self.max_refreshes_per_minute / 60)
+        self._tokens_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def due(self, key):
+        age = await self.entry_age(key)
+        return age is None or age >= self.ttl_seconds * (self.refresh_ahead - self._jitter.get(key, 0.0))
+
+    async def run_once(self):
+        """One scheduling pass; returns the keys a refresh was started for"""
+        self.cycles += 1
+        started = []
+        for key in self.hot_keys():
+            if not await self.due(key):
+                continue
+            if not self._take_token():
+                self.skipped_budget += 1
+                break
+            if self.start_refresh(key):
+                self.refreshes += 1
+                started.append(key)
+                # New jitter per refresh so hot keys do not settle into refreshing together
+                self._jitter[key] = random.uniform(0, self.jitter)
+        return started
+
+    async def _run(self):
+        while True:
+            # Jittered tick so several workers sharing a cache tier do not poll in lockstep
+            await asyncio.sleep(self.interval * random.uniform(0.8, 1.2))
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"[WARN] Prefetch pass failed: {e}")
+
+    async def start(self):
+        if self.running:
+            return
+        self._worker = asyncio.create_task(self._run())
+        print(f"[OK] Prefetch scheduler started (top_n={self.top_n}, "
+              f"max_refreshes_per_minute={self.max_refreshes_per_minute}, interval={self.interval:g}s)")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "tracked_keys": len(self._scores),
+            "hot_keys": self.hot_keys(),
+            "refreshes": self.refreshes,
+            "skipped_budget": self.skipped_budget,
+            "cycles": self.cycles,
+            "budget_tokens": round(self._tokens, 2),
+            "max_refreshes_per_minute": self.max_refreshes_per_minute
+        }
@@ -0,0 +1,55 @@
+import time
+from contextlib import contextmanager
+
+STARTUP_MODES = ("blocking", "background")
+
+
+class StartupReport:
+    """
+    Wall-clock breakdown of application startup.
+
+    Phases are recorded in the order they run; the report also carries the
+    time from this object's creation (app import) until the service became
+    ready, which is what an autoscaler waits for before routing traffic.
+    """
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.phases = {}
+        self.ready = False
+        self.finished = False
+        self.ready_after_ms = None
+        self.error = None
+        self.warmup = None
+
+    def record(self, name, elapsed_ms):
+        self.phases[name] = round(elapsed_ms, 1)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def finish(self, ready, error=None):
+        self.finished = True
+        self.ready = ready
+        self.error = error
+        self.ready_after_ms = round((time.perf_counter() - self.created) * 1000, 1)
+
+    def as_dict(self):
+        return {
+            "ready": self.ready,
+            "finished": self.finished,
+            "ready_after_ms": self.ready_after_ms,
+            "phases_ms": dict(self.phases),
+            "warmup": self.warmup,
+            "error": self.error
+        }
+
+    def print_report(self):
+        print(f"[OK] Startup finished in {self.ready_after_ms:.0f}ms (ready={self.ready})")
+        for name, elapsed_ms in self.phases.items():
+            print(f"  {name:<28} {elapsed_ms:>9.1f}ms")
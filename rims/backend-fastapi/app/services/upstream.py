@@ -0,0 +1,112 @@
+import httpx
+
+
+class UpstreamPool:
+    """
+    One pooled httpx.AsyncClient shared by every call to external APIs (OpenAQ, Gemini).
+
+    Connections are kept alive and reused across requests instead of paying a
+    TCP + TLS handshake per call. Each upstream gets its own read timeout;
+    connect and pool-acquire timeouts are shared. Per-upstream in-flight
+    requests and new TCP/TLS connections (via httpcore trace events) are
+    counted so pool utilisation and connection reuse can be monitored.
+    """
+
+    def __init__(self, max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0,
+                 connect_timeout=5.0, pool_timeout=5.0, timeouts=None, default_timeout=30.0, http2=False):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.pool_timeout = pool_timeout
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.http2 = http2
+        self.client = None
+
+        # Metrics
+        self.in_flight = {}
+        self.peak_in_flight = 0
+        self.requests = {}
+        self.connections_opened = {}
+        self.tls_handshakes = {}
+
+    @property
+    def running(self):
+        return self.client is not None and not self.client.is_closed
+
+    def start(self):
+        if self.running:
+            return
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        try:
+            self.client = httpx.AsyncClient(limits=limits, timeout=self.timeout_for(None), http2=self.http2)
+        except ImportError:
+            print("[WARN] UPSTREAM_HTTP2 needs the h2 package (pip install httpx[http2]); using HTTP/1.1")
+            self.http2 = False
+            self.client = httpx.AsyncClient(limits=limits, timeout=self.timeout_for(None))
+        print(f"[OK] Upstream HTTP pool ready (max_connections={self.max_connections}, "
+              f"keepalive={self.max_keepalive_connections}, http2={self.http2})")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def timeout_for(self, upstream, read_timeout=None):
+        read = read_timeout or self.timeouts.get(upstream, self.default_timeout)
+        return httpx.Timeout(read, connect=self.connect_timeout, pool=self.pool_timeout)
+
+    def _trace(self, upstream):
+        async def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                self.connections_opened[upstream] = self.connections_opened.get(upstream, 0) + 1
+            elif event_name == "connection.start_tls.complete":
+                self.tls_handshakes[upstream] = self.tls_handshakes.get(upstream, 0) + 1
+        return trace
+
+    async def request(self, upstream, method, url, read_timeout=None, **kwargs):
+        """client.request() with the upstream's timeout; read_timeout overrides it for this call"""
+        if not self.running:
+            self.start()
+        self.in_flight[upstream] = self.in_flight.get(upstream, 0) + 1
+        self.requests[upstream] = self.requests.get(upstream, 0) + 1
+        self.peak_in_flight = max(self.peak_in_flight, sum(self.in_flight.values()))
+        try:
+            return await self.client.request(
+                method, url, timeout=self.timeout_for(upstream, read_timeout),
+                extensions={"trace": self._trace(upstream)}, **kwargs
+            )
+        finally:
+            self.in_flight[upstream] -= 1
+
+    def connection_counts(self):
+        """(open, idle) connections in the pool; httpx keeps its pool on a private attribute, so best effort"""
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return len(connections), sum(1 for connection in connections if connection.is_idle())
+
+    def stats(self):
+        open_connections, idle_connections = self.connection_counts() if self.running else (0, 0)
+        in_flight_total = sum(self.in_flight.values())
+        return {
+            "running": self.running,
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "in_flight": dict(self.in_flight),
+            "in_flight_total": in_flight_total,
+            "peak_in_flight": self.peak_in_flight,
+            "utilization": round(in_flight_total / self.max_connections, 4) if self.max_connections else 0.0,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "requests": dict(self.requests),
+            "connections_opened": dict(self.connections_opened),
+            "tls_handshakes": dict(self.tls_handshakes),
+            "timeouts_s": {**self.timeouts, "default": self.default_timeout,
+                           "connect": self.connect_timeout, "pool": self.pool_timeout}
+        }
@@ -0,0 +1,127 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+EXECUTION_MODES = ("inline", "thread", "process")
+
+# Engine owned by a process-pool worker (loaded once by the initializer)
+_worker_engine = None
+
+
+def _init_process_worker(ml_path, model_path, scaler_path, torch_threads, feature_store_dir, backend,
+                         backend_options, warmup_options, logging_options):
+    """Process-pool initializer: preload (and optionally warm up) UrbanVoiceInference once per worker"""
+    global _worker_engine
+    if ml_path not in sys.path:
+        sys.path.append(ml_path)
+    from pipeline_logging import configure_logging
+    configure_logging(**(logging_options or {}))
+    import torch
+    torch.set_num_threads(torch_threads)
+    from inference_pipeline import UrbanVoiceInference
+    _worker_engine = UrbanVoiceInference(
+        model_path=model_path, scaler_path=scaler_path, feature_store_dir=feature_store_dir,
+        backend=backend, backend_options=backend_options
+    )
+    if warmup_options is not None:
+        from warmup import warm_up
+        warm_up(_worker_engine, **warmup_options)
+    print(f"[OK] Audio worker {os.getpid()} ready")
+
+
+def _call_worker_engine(log_context, method, *args):
+    from pipeline_logging import apply_log_context, end_request
+    tokens = apply_log_context(log_context)
+    try:
+        return getattr(_worker_engine, method)(*args)
+    finally:
+        end_request(tokens)
+
+
+def _ping():
+    return os.getpid()
+
+
+class AudioWorkerPool:
+    """
+    Runs the blocking audio pipeline off the event loop.
+
+    - inline:  call the engine directly on the event loop (previous behaviour)
+    - thread:  thread pool sharing the already-loaded engine
+    - process: process pool where every worker preloads its own engine
+    """
+
+    def __init__(self, engine, mode="thread", workers=2, ml_path=None,
+                 model_path=None, scaler_path=None, torch_threads=1, feature_store_dir=None, backend='eager',
+                 backend_options=None, warmup_options=None, logging_options=None):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode '{mode}', expected one of {EXECUTION_MODES}")
+        self.engine = engine
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.ml_path = ml_path
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.torch_threads = torch_threads
+        self.feature_store_dir = feature_store_dir
+        self.backend = backend
+        self.backend_options = backend_options or {}
+        # warm_up() keyword arguments for process workers (None = no warm-up)
+        self.warmup_options = warmup_options
+        # configure_logging() keyword arguments for process workers
+        self.logging_options = logging_options
+        self._executor = None
+        self.warmup_ms = 0.0
+
+    async def start(self):
+        """Create the executor and make sure every worker is up before serving"""
+        if self.mode == "inline" or self._executor is not None:
+            return
+
+        start_time = time.time()
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="audio-worker")
+        else:
+            # spawn avoids forking a parent that already holds torch/OpenMP state
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(self.ml_path, self.model_path, self.scaler_path, self.torch_threads,
+                          self.feature_store_dir, self.backend, self.backend_options, self.warmup_options,
+                          self.logging_options)
+            )
+
+        # Warm-up: one task per worker forces every worker (and its engine) to load now
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)])
+        self.warmup_ms = (time.time() - start_time) * 1000
+        print(f"[OK] Audio worker pool ready ({self.mode} x{self.workers}, warm-up {self.warmup_ms:.0f}ms)")
+
+    async def run(self, method, *args):
+        """Await engine.<method>(*args) on the pool"""
+        if self._executor is None:
+            return getattr(self.engine, method)(*args)
+
+        if self.mode == "thread":
+            # run_in_executor does not carry contextvars over; keep the request's correlation ID
+            call = partial(contextvars.copy_context().run, getattr(self.engine, method), *args)
+        else:
+            from pipeline_logging import log_context
+            call = partial(_call_worker_engine, log_context(), method, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def shutdown(self):
+        """Let in-flight jobs finish, drop queued ones, then release the workers"""
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.get_running_loop().run_in_executor(
+            None, partial(executor.shutdown, wait=True, cancel_futures=True)
+        )
+        print("[OK] Audio worker pool shut down")
@@ -0,0 +1,389 @@
+"""
+Load test for the UrbanVoice Sentinel API
+Replays a mix of /analyze (synthetic WAV/MP3 uploads), /air-quality and /chat
+traffic at a ramp of concurrency levels and reports throughput, p50/p95/p99
+latency and error rate per endpoint. OpenAQ and Gemini are replaced by a local
+stub server (OPENAQ_BASE_URL / GEMINI_BASE_URL), so runs are offline and
+repeatable. Results are written as JSON; --compare prints the change against
+an earlier run.
+
+Usage (from rims/backend-fastapi):
+    python load_test.py                               # spawn a local uvicorn with stub upstreams
+    python load_test.py --inprocess --ramp 1,8,32     # drive the ASGI app in this process
+    python load_test.py --url http://127.0.0.1:8000   # existing server (start it with the printed base URLs)
+    python load_test.py --compare loadtest_old.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.append('ml')
+
+ENDPOINTS = ('analyze', 'air-quality', 'chat')
+CHAT_MESSAGES = [
+    "What does a high risk result mean?",
+    "How does the acoustic analysis work?",
+    "Is the air quality in my area safe for running?",
+    "When should I see a doctor about my breathing?",
+]
+
+
+# ---------------------------------------------------------------- stub upstreams
+
+def create_stub_app(openaq_latency_ms, gemini_latency_ms):
+    """ASGI app answering the OpenAQ latest-measurements and Gemini generateContent calls"""
+    from fastapi import FastAPI
+
+    stub = FastAPI()
+
+    @stub.get("/openaq/locations/{location_id}/latest")
+    async def openaq_latest(location_id: int):
+        await asyncio.sleep(openaq_latency_ms / 1000)
+        return {
+            "meta": {"name": "openaq-api", "found": 1},
+            "results": [{
+                "datetime": {"utc": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())},
+                "value": round(random.uniform(5, 150), 1),
+                "coordinates": {"latitude": 40.7, "longitude": -74.0},
+                "sensorsId": location_id * 10,
+                "locationsId": location_id
+            }]
+        }
+
+    @stub.post("/gemini/models/{model}")
+    async def gemini_generate(model: str):
+        await asyncio.sleep(gemini_latency_ms / 1000)
+        return {"candidates": [{"content": {"parts": [{"text": "Stub response for load testing."}]}}]}
+
+    return stub
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_server(openaq_latency_ms, gemini_latency_ms):
+    """Serve the stubs from a daemon thread; returns (server, base URL)"""
+    import uvicorn
+
+    port = free_port()
+    config = uvicorn.Config(create_stub_app(openaq_latency_ms, gemini_latency_ms),
+                            host='127.0.0.1', port=port, log_level='warning')
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, name='upstream-stubs', daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+# ---------------------------------------------------------------- traffic
+
+def synthetic_uploads(n_clips, clip_seconds, mp3_fraction, sample_rate=16000, seed=0):
+    """[(filename, bytes, content type)] of varying length, some encoded as MP3"""
+    from dataset_generator import UrbanAcousticDatasetGenerator
+
+    np.random.seed(seed)
+    rng = random.Random(seed)
+    generator = UrbanAcousticDatasetGenerator(n_samples=n_clips, sample_rate=sample_rate)
+    uploads = []
+    for i in range(n_clips):
+        generator.duration = clip_seconds[i % len(clip_seconds)]
+        stressed = i % 2
+        audio = generator.generate_breathing_audio(
+            np.random.uniform(0.03, 0.08) if stressed else np.random.uniform(0.01, 0.025),
+            np.random.uniform(0.045, 0.12) if stressed else np.random.uniform(0.02, 0.04),
+            np.random.uniform(150, 400) if stressed else np.random.uniform(50, 150),
+            np.random.randint(1, 21)
+        )
+        buffer = io.BytesIO()
+        if rng.random() < mp3_fraction:
+            sf.write(buffer, audio, sample_rate, format='MP3')
+            uploads.append((f'clip_{i}.mp3', buffer.getvalue(), 'audio/mpeg'))
+        else:
+            sf.write(buffer, audio, sample_rate, format='WAV', subtype='PCM_16')
+            uploads.append((f'clip_{i}.wav', buffer.getvalue(), 'audio/wav'))
+    return uploads
+
+
+def parse_pairs(text, cast=float):
+    """'analyze=5,chat=1' -> {'analyze': 5.0, 'chat': 1.0}"""
+    pairs = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, value = item.split('=')
+        pairs[name.strip()] = cast(value)
+    return pairs
+
+
+async def send_request(client, endpoint, uploads, locations, rng):
+    if endpoint == 'analyze':
+        filename, data, content_type = rng.choice(uploads)
+        return await client.post('/api/v1/analyze', files={'file': (filename, data, content_type)})
+    if endpoint == 'air-quality':
+        # Few hot locations and a long tail, so the air-quality cache sees both hits and misses
+        location_id = locations[min(int(rng.paretovariate(1.2)) - 1, len(locations) - 1)]
+        return await client.get('/api/v1/air-quality', params={'location_id': location_id})
+    return await client.post('/api/v1/chat', json={'message': rng.choice(CHAT_MESSAGES)})
+
+
+async def run_stage(client, concurrency, duration_s, mix, uploads, locations, seed):
+    """Closed loop: concurrency workers each send the next request as soon as the previous one returns"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    records = []
+    deadline = time.perf_counter() + duration_s
+
+    async def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await send_request(client, endpoint, uploads, locations, rng)
+                ok = response.status_code < 400
+                status = response.status_code
+                if ok and endpoint == 'analyze':
+                    # Pipeline failures and "SYSTEM UNAVAILABLE" come back as 200 with an error body
+                    body = response.json()
+                    ok = 'error' not in body and body.get('risk_level') != 'ERROR'
+                    if not ok:
+                        status = 'pipeline_error'
+            except Exception as e:
+                ok, status = False, type(e).__name__
+            records.append((endpoint, (time.perf_counter() - start) * 1000, ok, status))
+
+    stage_start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(records, time.perf_counter() - stage_start)
+
+
+def latency_summary(latencies, errors, elapsed_s):
+    latencies = np.asarray(latencies)
+    return {
+        'requests': int(len(latencies)),
+        'throughput_rps': round(len(latencies) / elapsed_s, 2),
+        'error_rate': round(errors / len(latencies), 4) if len(latencies) else 0.0,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+    }
+
+
+def summarize(records, elapsed_s):
+    endpoints = {}
+    for endpoint in sorted({record[0] for record in records}):
+        matching = [record for record in records if record[0] == endpoint]
+        endpoints[endpoint] = latency_summary([record[1] for record in matching],
+                                              sum(not record[2] for record in matching), elapsed_s)
+        statuses = {}
+        for record in matching:
+            if not record[2]:
+                statuses[str(record[3])] = statuses.get(str(record[3]), 0) + 1
+        endpoints[endpoint]['errors_by_status'] = statuses
+    return {
+        'duration_s': round(elapsed_s, 2),
+        'endpoints': endpoints,
+        'total': latency_summary([record[1] for record in records], sum(not record[2] for record in records), elapsed_s)
+    }
+
+
+# ---------------------------------------------------------------- targets
+
+def wait_until_ready(base_url, timeout_s):
+    import httpx
+
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/v1/health/ready", timeout=2.0).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def spawn_uvicorn(env_overrides, ready_timeout_s):
+    """python -m uvicorn app.main:app on a free port; returns (process, base URL)"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port)],
+        env={**os.environ, **env_overrides}
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    if not wait_until_ready(base_url, ready_timeout_s):
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        raise RuntimeError(f"API did not become ready within {ready_timeout_s}s")
+    return process, base_url
+
+
+async def run_ramp(args, client, uploads):
+    mix = {name: weight for name, weight in parse_pairs(args.mix).items() if weight > 0}
+    unknown = set(mix) - set(ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown endpoints in --mix: {sorted(unknown)}")
+    locations = [5574 + i for i in range(args.locations)]
+
+    stages = []
+    for stage_index, concurrency in enumerate(int(level) for level in args.ramp.split(',')):
+        print(f"  Concurrency {concurrency} for {args.stage_seconds:.0f}s...")
+        stage = await run_stage(client, concurrency, args.stage_seconds, mix, uploads, locations,
+                                seed=args.seed + stage_index)
+        stage['concurrency'] = concurrency
+        stages.append(stage)
+        print_stage(stage)
+    return stages
+
+
+async def run_inprocess(args, env_overrides, uploads):
+    """ASGI transport straight into app.main (lifespan included); client and server share one event loop"""
+    import httpx
+
+    os.environ.update(env_overrides)
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://loadtest', timeout=args.timeout) as client:
+            return await run_ramp(args, client, uploads)
+
+
+async def run_http(args, base_url, uploads):
+    import httpx
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        return await run_ramp(args, client, uploads)
+
+
+# ---------------------------------------------------------------- reporting
+
+def format_ms(value):
+    """Percentile column; '-' when the endpoint saw no requests in the stage"""
+    return f"{value:>9.2f}ms" if value is not None else f"{'-':>9}  "
+
+
+def print_stage(stage):
+    for endpoint, entry in list(stage['endpoints'].items()) + [('total', stage['total'])]:
+        print(f"    {endpoint:<12} {entry['requests']:>6} req  {entry['throughput_rps']:>8.2f} req/s  "
+              f"p50 {format_ms(entry['p50_ms'])}  p95 {format_ms(entry['p95_ms'])}  p99 {format_ms(entry['p99_ms'])}  "
+              f"errors {entry['error_rate'] * 100:5.1f}%")
+
+
+def compare_runs(current, previous):
+    """Throughput and p95 change per (concurrency, endpoint) present in both runs"""
+    previous_stages = {stage['concurrency']: stage for stage in previous.get('stages', [])}
+    print(f"\nCompared with {previous.get('created', 'previous run')}:")
+    for stage in current['stages']:
+        before = previous_stages.get(stage['concurrency'])
+        if before is None:
+            continue
+        for endpoint, entry in list(stage['endpoints'].items()) + [('total', stage['total'])]:
+            old = before['total'] if endpoint == 'total' else before['endpoints'].get(endpoint)
+            if not old or not old['throughput_rps'] or not old['p95_ms'] or entry['p95_ms'] is None:
+                continue
+            print(f"  c={stage['concurrency']:<4} {endpoint:<12} "
+                  f"throughput {(entry['throughput_rps'] / old['throughput_rps'] - 1) * 100:+6.1f}%  "
+                  f"p95 {(entry['p95_ms'] / old['p95_ms'] - 1) * 100:+6.1f}%  "
+                  f"errors {old['error_rate'] * 100:.1f}% -> {entry['error_rate'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency ramp load test for the UrbanVoice Sentinel API")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--inprocess', action='store_true', help="Drive app.main in this process via ASGI")
+    target.add_argument('--url', default=None, help="Existing server; must use the stub base URLs printed at start")
+    parser.add_argument('--ramp', default='1,4,16,32', help="Concurrency levels, one stage each")
+    parser.add_argument('--stage-seconds', type=float, default=20.0)
+    parser.add_argument('--mix', default='analyze=5,air-quality=3,chat=2', help="Relative endpoint weights")
+    parser.add_argument('--clips', type=int, default=24, help="Distinct synthetic uploads")
+    parser.add_argument('--clip-seconds', default='3,10,30', help="Upload lengths, cycled over the clips")
+    parser.add_argument('--mp3-fraction', type=float, default=0.25, help="Share of uploads encoded as MP3")
+    parser.add_argument('--locations', type=int, default=20, help="Distinct air-quality location IDs")
+    parser.add_argument('--stub-latency-ms', default='openaq=150,gemini=800', help="Simulated upstream latency")
+    parser.add_argument('--result-cache', action='store_true',
+                        help="Keep the /analyze result cache on (repeated clips then measure cache hits)")
+    parser.add_argument('--ready-timeout', type=float, default=180.0)
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-request client timeout (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='loadtest_results.json')
+    parser.add_argument('--compare', default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    latency = parse_pairs(args.stub_latency_ms)
+    stub_server, stub_url = start_stub_server(latency.get('openaq', 150), latency.get('gemini', 800))
+    env_overrides = {
+        'OPENAQ_BASE_URL': f"{stub_url}/openaq",
+        'GEMINI_BASE_URL': f"{stub_url}/gemini",
+        'OPENAQ_API_KEY': 'stub',
+        'GEMINI_API_KEY': 'stub'
+    }
+    if not args.result_cache:
+        env_overrides['RESULT_CACHE_ENABLED'] = 'false'
+    print(f"[OK] Upstream stubs at {stub_url} "
+          f"(OPENAQ_BASE_URL={env_overrides['OPENAQ_BASE_URL']} GEMINI_BASE_URL={env_overrides['GEMINI_BASE_URL']})")
+
+    clip_seconds = [float(seconds) for seconds in args.clip_seconds.split(',')]
+    print(f"Generating {args.clips} synthetic uploads ({args.clip_seconds}s)...")
+    uploads = synthetic_uploads(args.clips, clip_seconds, args.mp3_fraction, seed=args.seed)
+
+    process = None
+    try:
+        if args.inprocess:
+            target_name = 'inprocess'
+            stages = asyncio.run(run_inprocess(args, env_overrides, uploads))
+        else:
+            if args.url:
+                base_url = args.url.rstrip('/')
+                if not wait_until_ready(base_url, args.ready_timeout):
+                    raise RuntimeError(f"{base_url} is not ready")
+            else:
+                print("Starting uvicorn...")
+                process, base_url = spawn_uvicorn(env_overrides, args.ready_timeout)
+            target_name = base_url
+            stages = asyncio.run(run_http(args, base_url, uploads))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        stub_server.should_exit = True
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'target': target_name,
+        'config': {
+            'ramp': args.ramp, 'stage_seconds': args.stage_seconds, 'mix': args.mix,
+            'clips': args.clips, 'clip_seconds': clip_seconds, 'mp3_fraction': args.mp3_fraction,
+            'locations': args.locations, 'stub_latency_ms': latency, 'result_cache': args.result_cache,
+            'cpu_count': os.cpu_count()
+        },
+        'stages': stages
+    }
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"[OK] Results saved to {args.output}")
+
+    if args.compare:
+        compare_runs(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,566 @@
+"""
+Streaming audio ingestion for UrbanVoice Sentinel
+Decodes, resamples and featurizes an upload chunk by chunk with bounded memory
+"""
+
+import struct
+import time
+from math import gcd
+
+import numpy as np
+import librosa
+from scipy.signal import firwin, get_window, resample_poly
+
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Input rates the resampler accepts; the up/down cap keeps its FIR (2 * 10 * max(up, down) + 1 taps)
+# small for every common rate (44100 -> 16000 is 160/441) and rejects near-coprime rates like 44101
+MAX_SAMPLE_RATE = 192000
+MAX_RESAMPLE_FACTOR = 1000
+
+
+class WavStreamDecoder:
+    """Incremental RIFF/WAVE decoder: feed raw bytes, get float32 mono samples back"""
+
+    def __init__(self):
+        self.sample_rate = None
+        self.channels = None
+        self._buffer = bytearray()
+        self._riff_checked = False
+        self._format = None
+        self._bits = None
+        self._block_align = None
+        self._skip = 0
+        self._data_remaining = None
+        self._in_data = False
+
+    @property
+    def ready(self):
+        """True once the fmt chunk has been parsed"""
+        return self.sample_rate is not None
+
+    @property
+    def finished(self):
+        """True once a sized data chunk has been fully decoded; later bytes (trailing chunks) are discarded"""
+        return self._in_data and self._data_remaining == 0
+
+    def feed(self, data):
+        """Consume bytes and return any complete samples as a float32 mono array"""
+        if self.finished:
+            return np.zeros(0, dtype=np.float32)
+        self._buffer.extend(data)
+
+        if not self._riff_checked:
+            if len(self._buffer) < 12:
+                return np.zeros(0, dtype=np.float32)
+            if self._buffer[0:4] != b'RIFF' or self._buffer[8:12] != b'WAVE':
+                raise ValueError("Streaming ingestion only supports RIFF/WAVE audio")
+            del self._buffer[:12]
+            self._riff_checked = True
+
+        while not self._in_data:
+            if self._skip:
+                skipped = min(self._skip, len(self._buffer))
+                del self._buffer[:skipped]
+                self._skip -= skipped
+                if self._skip:
+                    return np.zeros(0, dtype=np.float32)
+            if len(self._buffer) < 8:
+                return np.zeros(0, dtype=np.float32)
+
+            chunk_id = bytes(self._buffer[0:4])
+            chunk_size = struct.unpack('<I', self._buffer[4:8])[0]
+
+            if chunk_id == b'data':
+                if not self.ready:
+                    raise ValueError("WAVE data chunk found before fmt chunk")
+                del self._buffer[:8]
+                # Streaming writers often leave the size as 0 or 0xFFFFFFFF
+                self._data_remaining = None if chunk_size in (0, 0xFFFFFFFF) else chunk_size
+                self._in_data = True
+            elif chunk_id == b'fmt ':
+                if len(self._buffer) < 8 + chunk_size:
+                    return np.zeros(0, dtype=np.float32)
+                self._parse_fmt(bytes(self._buffer[8:8 + chunk_size]))
+                del self._buffer[:8 + chunk_size + (chunk_size & 1)]
+            else:
+                # Skip LIST/fact/etc. chunks (padded to an even size)
+                del self._buffer[:8]
+                self._skip = chunk_size + (chunk_size & 1)
+
+        return self._decode_available()
+
+    def _parse_fmt(self, fmt):
+        if len(fmt) < 16:
+            raise ValueError("Malformed WAVE fmt chunk")
+        audio_format, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+        if audio_format == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            audio_format = struct.unpack('<H', fmt[24:26])[0]
+
+        supported = (
+            (audio_format == WAVE_FORMAT_PCM and bits in (8, 16, 24, 32)) or
+            (audio_format == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64))
+        )
+        if not supported or channels < 1:
+            raise ValueError(f"Unsupported WAVE encoding (format={audio_format}, bits={bits})")
+        if not 0 < sample_rate <= MAX_SAMPLE_RATE:
+            raise ValueError(f"Unsupported WAVE sample rate {sample_rate} Hz")
+        if block_align != channels * bits // 8:
+            raise ValueError(f"Malformed WAVE fmt chunk (block_align={block_align})")
+
+        self._format = audio_format
+        self._bits = bits
+        self._block_align = block_align
+        self.channels = channels
+        self.sample_rate = sample_rate
+
+    def _decode_available(self):
+        available = len(self._buffer)
+        if self._data_remaining is not None:
+            available = min(available, self._data_remaining)
+        n_bytes = (available // self._block_align) * self._block_align
+        if n_bytes == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        raw = bytes(self._buffer[:n_bytes])
+        del self._buffer[:n_bytes]
+        if self._data_remaining is not None:
+            self._data_remaining -= n_bytes
+            if self._data_remaining < self._block_align:
+                # No complete frame can follow (an odd-sized chunk leaves a few stray bytes)
+                self._data_remaining = 0
+                self._buffer.clear()
+
+        if self._format == WAVE_FORMAT_IEEE_FLOAT:
+            samples = np.frombuffer(raw, dtype='<f4' if self._bits == 32 else '<f8').astype(np.float32)
+        elif self._bits == 8:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif self._bits == 16:
+            samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+        elif self._bits == 24:
+            b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            values = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            values = np.where(values >= 1 << 23, values - (1 << 24), values)
+            samples = values.astype(np.float32) / (1 << 23)
+        else:
+            samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+
+        # Downmix to mono
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return samples
+
+
+class StreamingResampler:
+    """
+    Chunked polyphase resampler whose output matches scipy's resample_poly on the
+    whole signal: each block is filtered with enough left/right context that the
+    FIR never sees a chunk boundary. Adds `context` input samples of latency.
+    """
+
+    def __init__(self, orig_sr, target_sr):
+        for rate in (orig_sr, target_sr):
+            if not isinstance(rate, int) or not 0 < rate <= MAX_SAMPLE_RATE:
+                raise ValueError(f"Unsupported sample rate {rate!r}, expected 1-{MAX_SAMPLE_RATE} Hz")
+        divisor = gcd(orig_sr, target_sr)
+        self.up = target_sr // divisor
+        self.down = orig_sr // divisor
+        if max(self.up, self.down) > MAX_RESAMPLE_FACTOR:
+            raise ValueError(f"Cannot resample {orig_sr} Hz to {target_sr} Hz "
+                             f"(ratio {self.up}/{self.down} exceeds {MAX_RESAMPLE_FACTOR})")
+        self.passthrough = self.up == self.down
+
+        # Same Kaiser low-pass resample_poly designs, built once instead of per chunk
+        max_rate = max(self.up, self.down)
+        self._filter = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+
+        # Filter half-width in input samples, rounded to whole `down` blocks
+        half_width = 10 * max_rate // self.up + 1
+        self.context = -(-half_width // self.down) * self.down
+
+        self._history = np.zeros(0, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def process(self, samples):
+        """Resample as much of the stream as can be finalized without more input"""
+        if self.passthrough:
+            return samples
+        self._pending = np.concatenate([self._pending, samples])
+        n_ready = ((len(self._pending) - self.context) // self.down) * self.down
+        if n_ready <= 0:
+            return np.zeros(0, dtype=np.float32)
+        return self._emit(n_ready, final=False)
+
+    def flush(self):
+        """Resample whatever is left at end of stream"""
+        if self.passthrough or len(self._pending) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self._emit(len(self._pending), final=True)
+
+    def _emit(self, n_ready, final):
+        segment = np.concatenate([self._history, self._pending])
+        resampled = resample_poly(segment, self.up, self.down, window=self._filter).astype(np.float32)
+
+        # History is always a whole number of `down` blocks, so this offset is exact
+        start = len(self._history) * self.up // self.down
+        end = len(resampled) if final else start + n_ready * self.up // self.down
+
+        self._history = np.concatenate([self._history, self._pending[:n_ready]])[-self.context:]
+        self._pending = self._pending[n_ready:]
+        return resampled[start:end]
+
+
+class StreamingFrameAnalyzer:
+    """
+    Incremental STFT framing (centred, like librosa.stft) that turns a sample stream
+    into per-frame mel power and spectral descriptors using AudioProcessor's settings.
+
+    The spectral noise gate is applied per frame against the running peak magnitude,
+    which is the streaming stand-in for spectral_noise_gate's whole-clip ref=np.max.
+    With peak_window_frames, the reference is instead the peak of the last that many
+    frames, so a live session's gate follows its current window rather than the
+    loudest moment since it started.
+    """
+
+    def __init__(self, sample_rate=16000, n_fft=2048, hop_length=512, n_mels=128, threshold_db=-30,
+                 peak_window_frames=None):
+        self.sr = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.gate_ratio = 10 ** (threshold_db / 20)
+        self.peak_window_frames = peak_window_frames
+        self._recent_peaks = np.zeros(0)
+        self.window = get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self.freqs = np.fft.rfftfreq(n_fft, d=1.0 / sample_rate)
+        self.mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels)
+        self.peak_magnitude = 0.0
+        # Centre padding so frame t is centred on sample t * hop_length
+        self._buffer = np.zeros(n_fft // 2, dtype=np.float32)
+
+    def process(self, samples):
+        """Analyze every complete frame now available; returns None if there are none"""
+        self._buffer = np.concatenate([self._buffer, samples])
+        if len(self._buffer) < self.n_fft:
+            return None
+        n_frames = 1 + (len(self._buffer) - self.n_fft) // self.hop_length
+        frames = np.lib.stride_tricks.sliding_window_view(self._buffer, self.n_fft)[::self.hop_length][:n_frames]
+        result = self.analyze_frames(frames)
+        self._buffer = self._buffer[n_frames * self.hop_length:]
+        return result
+
+    def flush(self):
+        """Pad the tail like a centred STFT and analyze the final frames"""
+        padded = np.concatenate([self._buffer, np.zeros(self.n_fft // 2, dtype=np.float32)])
+        if len(padded) < self.n_fft:
+            padded = np.pad(padded, (0, self.n_fft - len(padded)))
+        self._buffer = np.zeros(0, dtype=np.float32)
+        return self.process(padded)
+
+    def analyze_frames(self, frames):
+        """Per-frame features for a [n_frames, n_fft] block of time-domain frames"""
+        magnitude = np.abs(np.fft.rfft(frames * self.window, axis=1))
+
+        # Spectral noise gate against the running (or trailing-window) peak
+        frame_peaks = magnitude.max(axis=1)
+        if self.peak_window_frames:
+            window = self.peak_window_frames
+            history = np.concatenate([self._recent_peaks, frame_peaks])
+            padded = np.concatenate([np.zeros(window - 1), history])[-(len(frame_peaks) + window - 1):]
+            reference = np.lib.stride_tricks.sliding_window_view(padded, window).max(axis=1)[:, None]
+            self._recent_peaks = history[len(history) - (window - 1):]
+            self.peak_magnitude = float(reference[-1, 0])
+        else:
+            self.peak_magnitude = max(self.peak_magnitude, float(frame_peaks.max()))
+            reference = self.peak_magnitude
+        magnitude = magnitude * (magnitude > reference * self.gate_ratio)
+        power = magnitude ** 2
+
+        # Spectral centroid / bandwidth (librosa's magnitude-weighted definitions)
+        total = magnitude.sum(axis=1)
+        safe_total = np.where(total > 0, total, 1.0)
+        centroid = (magnitude @ self.freqs) / safe_total
+        spread = (magnitude * (self.freqs[None, :] - centroid[:, None]) ** 2).sum(axis=1) / safe_total
+        bandwidth = np.sqrt(spread)
+
+        # Spectral flatness on the power spectrum
+        floored = np.maximum(power, 1e-10)
+        flatness = np.exp(np.mean(np.log(floored), axis=1)) / np.mean(floored, axis=1)
+
+        # RMS energy of the frame
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+        # Zero-crossing rate of the gated signal via Rice's formula (2 * RMS frequency / sr),
+        # since the gated waveform itself is never reconstructed
+        power_total = power.sum(axis=1)
+        rms_frequency = np.sqrt((power @ self.freqs ** 2) / np.where(power_total > 0, power_total, 1.0))
+        zcr = 2 * rms_frequency / self.sr
+
+        return {
+            'mel_power': power @ self.mel_basis.T,
+            'centroid': centroid,
+            'bandwidth': bandwidth,
+            'flatness': flatness,
+            'rms': rms,
+            'zcr': zcr
+        }
+
+
+class StreamingFeatureAccumulator:
+    """
+    Folds per-frame features into clip-level MFCCs and acoustic statistics in bounded memory.
+
+    Mel frames are averaged into at most `max_slots` time slots; whenever the slot count
+    would exceed that, adjacent slots are merged pairwise and each slot covers twice as
+    many frames. RMS values go into a fixed 0.1 dB histogram for the silence ratio.
+    """
+
+    RMS_DB_FLOOR = -160.0
+    RMS_DB_STEP = 0.1
+    RMS_DB_BINS = 2000
+
+    def __init__(self, n_mfcc=13, n_frames=100, max_slots=512):
+        self.n_mfcc = n_mfcc
+        self.n_frames = n_frames
+        self.max_slots = max(2 * n_frames, max_slots)
+        self.frames_per_slot = 1
+        self.frame_count = 0
+        self._slot_sums = []
+        self._slot_counts = []
+
+        # Running sums for clip-level statistics
+        self._sums = {'centroid': 0.0, 'centroid_sq': 0.0, 'bandwidth': 0.0,
+                      'flatness': 0.0, 'rms': 0.0, 'rms_sq': 0.0, 'zcr': 0.0}
+        self._rms_histogram = np.zeros(self.RMS_DB_BINS, dtype=np.int64)
+        self._rms_max = 0.0
+
+    def add(self, frame_features):
+        """Accumulate one analyze_frames() result"""
+        if frame_features is None:
+            return
+        rms = frame_features['rms']
+        self.frame_count += len(rms)
+
+        centroid = frame_features['centroid']
+        self._sums['centroid'] += float(centroid.sum())
+        self._sums['centroid_sq'] += float((centroid ** 2).sum())
+        self._sums['bandwidth'] += float(frame_features['bandwidth'].sum())
+        self._sums['flatness'] += float(frame_features['flatness'].sum())
+        self._sums['rms'] += float(rms.sum())
+        self._sums['rms_sq'] += float((rms ** 2).sum())
+        self._sums['zcr'] += float(frame_features['zcr'].sum())
+
+        self._rms_max = max(self._rms_max, float(rms.max()))
+        np.add.at(self._rms_histogram, self._rms_bins(rms), 1)
+
+        for mel in frame_features['mel_power']:
+            self._add_mel_frame(mel)
+
+    def _rms_bins(self, rms):
+        db = 20 * np.log10(np.maximum(rms, 1e-12))
+        return np.clip(((db - self.RMS_DB_FLOOR) / self.RMS_DB_STEP).astype(np.int64), 0, self.RMS_DB_BINS - 1)
+
+    def _add_mel_frame(self, mel):
+        if self._slot_counts and self._slot_counts[-1] < self.frames_per_slot:
+            self._slot_sums[-1] += mel
+            self._slot_counts[-1] += 1
+            return
+        self._slot_sums.append(mel.astype(np.float64))
+        self._slot_counts.append(1)
+
+        if len(self._slot_counts) > self.max_slots:
+            # Halve the time resolution: merge neighbouring slots
+            merged_sums, merged_counts = [], []
+            for i in range(0, len(self._slot_counts), 2):
+                merged_sums.append(sum(self._slot_sums[i:i + 2]))
+                merged_counts.append(sum(self._slot_counts[i:i + 2]))
+            self._slot_sums, self._slot_counts = merged_sums, merged_counts
+            self.frames_per_slot *= 2
+
+    def finalize(self):
+        """Return (mfcc [n_mfcc, n_frames], acoustic stats dict) for the whole stream"""
+        if self.frame_count == 0:
+            raise ValueError("No audio frames received")
+
+        # Collapse slots into exactly n_frames time steps
+        sums = np.array(self._slot_sums)
+        counts = np.array(self._slot_counts, dtype=np.float64)
+        if len(counts) >= self.n_frames:
+            groups = np.array_split(np.arange(len(counts)), self.n_frames)
+            mel = np.stack([sums[g].sum(axis=0) / counts[g].sum() for g in groups], axis=1)
+        else:
+            mel = (sums / counts[:, None]).T
+
+        mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=self.n_mfcc)
+        if mfcc.shape[1] < self.n_frames:
+            mfcc = np.pad(mfcc, ((0, 0), (0, self.n_frames - mfcc.shape[1])), mode='edge')
+
+        n = self.frame_count
+        mean_centroid = self._sums['centroid'] / n
+        mean_rms = self._sums['rms'] / n
+
+        # Silence ratio: frames quieter than 15% of the loudest frame
+        if self._rms_max > 0:
+            threshold_bin = self._rms_bins(np.array([0.15 * self._rms_max]))[0]
+            silence_ratio = self._rms_histogram[:threshold_bin].sum() / n
+        else:
+            silence_ratio = 0.0
+
+        stats = {
+            'mean_centroid': mean_centroid,
+            'std_centroid': np.sqrt(max(self._sums['centroid_sq'] / n - mean_centroid ** 2, 0)),
+            'mean_zcr': self._sums['zcr'] / n,
+            'mean_bandwidth': self._sums['bandwidth'] / n,
+            'mean_rms': mean_rms,
+            'std_rms': np.sqrt(max(self._sums['rms_sq'] / n - mean_rms ** 2, 0)),
+            'mean_flatness': self._sums['flatness'] / n,
+            'silence_ratio': float(silence_ratio)
+        }
+        return mfcc.astype(np.float32), stats
+
+
+class StreamingAudioSession:
+    """
+    One streamed upload: WAV bytes in, MFCCs and acoustic statistics out.
+
+    Silence trimming is skipped in streaming mode because it needs the loudest
+    frame of the whole clip before any audio can be kept or dropped.
+    """
+
+    def __init__(self, sample_rate=16000, n_fft=2048, hop_length=512, threshold_db=-30):
+        self.sr = sample_rate
+        self.decoder = WavStreamDecoder()
+        self.resampler = None
+        self.analyzer = StreamingFrameAnalyzer(sample_rate, n_fft, hop_length, threshold_db=threshold_db)
+        self.accumulator = StreamingFeatureAccumulator()
+        self.bytes_received = 0
+        self.decode_ms = 0.0
+        self.features_ms = 0.0
+
+    def feed(self, data):
+        """Consume one chunk of the upload"""
+        self.bytes_received += len(data)
+
+        start = time.time()
+        samples = self.decoder.feed(data)
+        if self.resampler is None and self.decoder.ready:
+            self.resampler = StreamingResampler(self.decoder.sample_rate, self.sr)
+        if self.resampler is not None and len(samples):
+            samples = self.resampler.process(samples)
+        self.decode_ms += (time.time() - start) * 1000
+
+        if len(samples):
+            self._analyze(samples)
+
+    def _analyze(self, samples):
+        start = time.time()
+        self.accumulator.add(self.analyzer.process(samples))
+        self.features_ms += (time.time() - start) * 1000
+
+    def finish(self):
+        """Flush the tail of the stream and return (mfcc, acoustic stats)"""
+        if self.resampler is None:
+            raise ValueError("Upload ended before a complete WAVE header was received")
+        tail = self.resampler.flush()
+        if len(tail):
+            self._analyze(tail)
+
+        start = time.time()
+        self.accumulator.add(self.analyzer.flush())
+        self.features_ms += (time.time() - start) * 1000
+        return self.accumulator.finalize()
+
+
+class SlidingWindowAnalyzer:
+    """
+    Live screening over the last `window_seconds` of a PCM stream.
+
+    Each incoming frame is analyzed exactly once: its MFCC vector and spectral
+    descriptors go into fixed-size ring buffers. Every `hop_seconds` a snapshot
+    picks n_frames columns from the MFCC ring and summarizes the descriptor
+    rings, so per-hop cost is independent of how long the session has run.
+    """
+
+    ENCODINGS = {'pcm_s16le': ('<i2', 32768.0), 'f32le': ('<f4', 1.0)}
+
+    def __init__(self, input_sr=16000, sample_rate=16000, encoding='pcm_s16le',
+                 window_seconds=3.0, hop_seconds=0.5, n_fft=2048, hop_length=512,
+                 n_mfcc=13, n_frames=100, threshold_db=-30):
+        if encoding not in self.ENCODINGS:
+            raise ValueError(f"Unsupported encoding '{encoding}', expected one of {list(self.ENCODINGS)}")
+        self.dtype, self.scale = self.ENCODINGS[encoding]
+        self.sample_width = np.dtype(self.dtype).itemsize
+        self.n_mfcc = n_mfcc
+        self.n_frames = n_frames
+
+        self.resampler = StreamingResampler(input_sr, sample_rate)
+        self.window_frames = max(1, int(round(window_seconds * sample_rate / hop_length)))
+        # Gate each frame against the peak of the window it belongs to (the buffered path's per-clip gate)
+        self.analyzer = StreamingFrameAnalyzer(sample_rate, n_fft, hop_length, threshold_db=threshold_db,
+                                               peak_window_frames=self.window_frames)
+        self.hop_frames = max(1, int(round(hop_seconds * sample_rate / hop_length)))
+        self.frame_seconds = hop_length / sample_rate
+
+        # Ring buffers, one column/entry per STFT frame
+        self._mfcc_ring = np.zeros((n_mfcc, self.window_frames), dtype=np.float32)
+        self._rings = {name: np.zeros(self.window_frames) for name in
+                       ('centroid', 'bandwidth', 'flatness', 'rms', 'zcr')}
+        self._leftover = b''
+        self.frames_seen = 0
+        self._frames_since_emit = 0
+
+    def feed(self, data):
+        """Consume raw PCM bytes; returns a list of (mfcc, stats, t_seconds) snapshots, one per hop crossed"""
+        data = self._leftover + data
+        usable = len(data) - len(data) % self.sample_width
+        self._leftover = data[usable:]
+        if usable == 0:
+            return []
+
+        samples = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32) / self.scale
+        features = self.analyzer.process(self.resampler.process(samples))
+        if features is None:
+            return []
+
+        # Per-frame MFCCs (DCT of log-mel), computed once per frame
+        log_mel = 10 * np.log10(np.maximum(features['mel_power'].T, 1e-10))
+        frame_mfcc = librosa.feature.mfcc(S=log_mel, n_mfcc=self.n_mfcc)
+
+        snapshots = []
+        for i in range(frame_mfcc.shape[1]):
+            slot = self.frames_seen % self.window_frames
+            self._mfcc_ring[:, slot] = frame_mfcc[:, i]
+            for name, ring in self._rings.items():
+                ring[slot] = features[name][i]
+            self.frames_seen += 1
+            self._frames_since_emit += 1
+
+            if self.frames_seen >= self.window_frames and self._frames_since_emit >= self.hop_frames:
+                self._frames_since_emit = 0
+                mfcc, stats = self.snapshot()
+                snapshots.append((mfcc, stats, round(self.frames_seen * self.frame_seconds, 3)))
+        return snapshots
+
+    def snapshot(self):
+        """(mfcc [n_mfcc, n_frames], acoustic stats) for the current window"""
+        # Unroll the ring into chronological order
+        order = (np.arange(self.window_frames) + self.frames_seen) % self.window_frames
+        columns = np.linspace(0, self.window_frames - 1, self.n_frames).round().astype(int)
+        mfcc = self._mfcc_ring[:, order[columns]]
+
+        rms = self._rings['rms']
+        peak = rms.max()
+        stats = {
+            'mean_centroid': float(self._rings['centroid'].mean()),
+            'std_centroid': float(self._rings['centroid'].std()),
+            'mean_zcr': float(self._rings['zcr'].mean()),
+            'mean_bandwidth': float(self._rings['bandwidth'].mean()),
+            'mean_rms': float(rms.mean()),
+            'std_rms': float(rms.std()),
+            'mean_flatness': float(self._rings['flatness'].mean()),
+            'silence_ratio': float(np.mean(rms < 0.15 * peak)) if peak > 0 else 0.0
+        }
+        return mfcc, stats
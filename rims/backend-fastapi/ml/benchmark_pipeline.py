@@ -0,0 +1,209 @@
+"""
+Benchmark suite for the UrbanVoice Sentinel inference pipeline
+Times every AudioProcessor stage, normalize_features, predict at several
+batch sizes and end-to-end process_audio for 3s / 30s / 5min clips, all on
+synthetic audio from UrbanAcousticDatasetGenerator (no dataset needed).
+Results are compared against a stored baseline; any benchmark whose median
+slows down by more than --threshold fails the run (exit code 1).
+
+Usage:
+    python ml/benchmark_pipeline.py --save-baseline           # record benchmarks/baseline.json
+    python ml/benchmark_pipeline.py --threshold 0.25          # compare against it
+    python ml/benchmark_pipeline.py --filter predict --quick  # subset, skip the 5 minute clip
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+import torch
+
+from dataset_generator import UrbanAcousticDatasetGenerator
+from inference_pipeline import UrbanVoiceInference
+
+DEFAULT_BASELINE = Path(__file__).parent / 'benchmarks' / 'baseline.json'
+CLIP_SECONDS = {'3s': 3.0, '30s': 30.0, '5min': 300.0}
+PREDICT_BATCH_SIZES = (1, 8, 32, 128)
+
+
+def synthetic_audio(seconds, sample_rate=16000, seed=0):
+    """Stressed-breathing clip of the given length"""
+    np.random.seed(seed)
+    generator = UrbanAcousticDatasetGenerator(n_samples=1, sample_rate=sample_rate)
+    generator.duration = seconds
+    return generator.generate_breathing_audio(jitter=0.05, shimmer=0.08, aqi=250, floor=10)
+
+
+def measure(function, min_time=0.5, min_rounds=5, max_rounds=200, warmup=2):
+    """Time function() repeatedly; returns median/p95/min in ms"""
+    for _ in range(warmup):
+        function()
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_rounds and (len(timings) < min_rounds or time.perf_counter() - start < min_time):
+        call_start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - call_start) * 1000)
+    return {
+        'median_ms': round(float(np.median(timings)), 4),
+        'p95_ms': round(float(np.percentile(timings, 95)), 4),
+        'min_ms': round(float(np.min(timings)), 4),
+        'rounds': len(timings)
+    }
+
+
+def build_benchmarks(engine, workdir, clip_lengths):
+    """Ordered {name: zero-argument callable}"""
+    processor = engine.audio_processor
+    paths = {}
+    for label in clip_lengths:
+        paths[label] = os.path.join(workdir, f'clip_{label}.wav')
+        sf.write(paths[label], synthetic_audio(CLIP_SECONDS[label], processor.sr), processor.sr)
+
+    # Intermediate results of a 3s clip feed the per-stage benchmarks
+    audio = processor.load_audio(paths['3s'])
+    trimmed = processor.trim_silence(audio, threshold=engine.trim_threshold)
+    gated = processor.spectral_noise_gate(trimmed, threshold_db=engine.noise_gate_db)
+    S = processor.magnitude_spectrogram(gated)
+    power = processor.mfcc_power_frames(gated, S)
+    mfcc = processor.mfcc_from_power([power])[0]
+    stats = processor.measure_acoustic_stats(gated, S)
+    acoustic_features = processor.score_acoustic_stats(stats)
+    normalized = engine.normalize_features(mfcc)
+
+    benchmarks = {
+        'stage.load_audio[3s]': lambda: processor.load_audio(paths['3s']),
+        'stage.trim_silence[3s]': lambda: processor.trim_silence(audio, threshold=engine.trim_threshold),
+        'stage.spectral_noise_gate[3s]': lambda: processor.spectral_noise_gate(trimmed, threshold_db=engine.noise_gate_db),
+        'stage.magnitude_spectrogram[3s]': lambda: processor.magnitude_spectrogram(gated),
+        'stage.mfcc_power_frames[3s]': lambda: processor.mfcc_power_frames(gated, S),
+        'stage.mfcc_from_power[3s]': lambda: processor.mfcc_from_power([power]),
+        'stage.measure_acoustic_stats[3s]': lambda: processor.measure_acoustic_stats(gated, S),
+        'stage.score_acoustic_stats': lambda: processor.score_acoustic_stats(stats),
+        'normalize_features': lambda: engine.normalize_features(mfcc),
+        'calibrate_risk': lambda: engine.calibrate_risk(0.5, acoustic_features)
+    }
+    for batch_size in PREDICT_BATCH_SIZES:
+        batch = [normalized] * batch_size
+        benchmarks[f'predict[batch={batch_size}]'] = lambda batch=batch: engine.predict_batch(batch)
+    for label in clip_lengths:
+        benchmarks[f'process_audio[{label}]'] = lambda path=paths[label]: engine.process_audio(path)
+    return benchmarks
+
+
+def machine_info():
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads()
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """{name: status}; a regression needs both the relative and the absolute slowdown"""
+    statuses = {}
+    for name, entry in results.items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            statuses[name] = 'new'
+            continue
+        delta = entry['median_ms'] - reference['median_ms']
+        change = delta / reference['median_ms'] if reference['median_ms'] else 0.0
+        entry['baseline_median_ms'] = reference['median_ms']
+        entry['change'] = round(change, 4)
+        if change > threshold and delta > min_delta_ms:
+            statuses[name] = 'REGRESSION'
+        elif change < -threshold and -delta > min_delta_ms:
+            statuses[name] = 'faster'
+        else:
+            statuses[name] = 'ok'
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the inference pipeline against a stored baseline")
+    parser.add_argument('--model', default='models/respira_net_v1.pt')
+    parser.add_argument('--scaler', default='models/scaler.pkl')
+    parser.add_argument('--backend', default='eager', help="Inference backend (eager, torchscript, int8, onnx)")
+    parser.add_argument('--threads', type=int, default=1, help="torch threads (match AUDIO_WORKER_TORCH_THREADS)")
+    parser.add_argument('--filter', default=None, help="Regex; only run matching benchmarks")
+    parser.add_argument('--quick', action='store_true', help="Skip the 5 minute clip")
+    parser.add_argument('--min-time', type=float, default=0.5, help="Seconds to spend per benchmark (at least 5 rounds)")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    parser.add_argument('--save-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative median slowdown")
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    engine = UrbanVoiceInference(model_path=args.model, scaler_path=args.scaler, backend=args.backend)
+    clip_lengths = [label for label in CLIP_SECONDS if not (args.quick and label == '5min')]
+
+    with tempfile.TemporaryDirectory(prefix='urbanvoice_bench_') as workdir:
+        benchmarks = build_benchmarks(engine, workdir, clip_lengths)
+        if args.filter:
+            benchmarks = {name: fn for name, fn in benchmarks.items() if re.search(args.filter, name)}
+
+        print(f"Running {len(benchmarks)} benchmarks ({args.threads} torch thread(s), backend {engine.backend.name if engine.backend else 'none'})...")
+        results = {}
+        for name, function in benchmarks.items():
+            # Long clips get fewer rounds; the 5 minute clip alone takes seconds per call
+            min_rounds = 3 if name.startswith('process_audio') else 5
+            results[name] = measure(function, min_time=args.min_time, min_rounds=min_rounds)
+
+    report = {
+        'machine': machine_info(),
+        'backend': engine.backend.name if engine.backend else None,
+        'model_digest': engine.model_digest,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': results
+    }
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2))
+        statuses = {name: 'saved' for name in results}
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get('machine', {}).get('cpu_count') != os.cpu_count():
+            print(f"[WARN] Baseline was recorded on a different machine ({baseline.get('machine')})")
+        statuses = compare(results, baseline, args.threshold, args.min_delta_ms)
+        regressions = [name for name, status in statuses.items() if status == 'REGRESSION']
+    else:
+        print(f"[WARN] No baseline at {baseline_path}; run with --save-baseline to record one")
+        statuses = {name: 'no baseline' for name in results}
+
+    for name, entry in results.items():
+        change = f"{entry['change'] * 100:+.1f}%" if 'change' in entry else ''
+        print(f"  {name:<36} median {entry['median_ms']:>10.3f}ms  p95 {entry['p95_ms']:>10.3f}ms  "
+              f"{change:>8}  {statuses[name]}")
+
+    report['statuses'] = statuses
+    Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        print(f"[OK] Baseline saved to {baseline_path}")
+    elif regressions:
+        print(f"[ERROR] {len(regressions)} benchmark(s) slower than baseline by >{args.threshold * 100:.0f}%: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print("[OK] No regressions")
+    print(f"  Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
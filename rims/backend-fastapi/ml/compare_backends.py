@@ -0,0 +1,152 @@
+"""
+Accuracy drift and latency report for the SentinelNet inference backends
+Scores a held-out set with every backend and compares it against the FP32
+eager model, so CPU-only nodes can run the fastest backend whose drift is acceptable
+
+Usage:
+    python ml/compare_backends.py --model models/respira_net_v1.pt --data models/X_mfcc.npy --labels models/y_risk.npy
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from sklearn.metrics import roc_auc_score
+
+from dataset_generator import UrbanAcousticDatasetGenerator
+from inference_backends import INFERENCE_BACKENDS, create_backend
+from inference_pipeline import UrbanVoiceInference
+from model_architecture import fuse_sentinel_net, is_fused
+
+
+def load_holdout(data_path, labels_path, holdout_fraction):
+    """Last holdout_fraction of a saved dataset as (X, y)"""
+    X = np.load(data_path)
+    y = np.load(labels_path) if labels_path and Path(labels_path).exists() else None
+    start = int(len(X) * (1 - holdout_fraction))
+    return X[start:], (y[start:] if y is not None else None)
+
+
+def synthetic_holdout(n_samples, seed=1234):
+    """Fresh balanced clips from the dataset generator when no saved dataset is available"""
+    np.random.seed(seed)
+    generator = UrbanAcousticDatasetGenerator(n_samples=n_samples)
+    X, y = [], []
+    for i in range(n_samples):
+        stressed = i % 2
+        if stressed:
+            params = (np.random.uniform(0.03, 0.08), np.random.uniform(0.045, 0.12),
+                      np.random.uniform(150, 400), np.random.randint(1, 21))
+        else:
+            params = (np.random.uniform(0.01, 0.025), np.random.uniform(0.02, 0.04),
+                      np.random.uniform(50, 150), np.random.randint(1, 21))
+        X.append(generator.extract_mfcc_features(generator.generate_breathing_audio(*params)))
+        y.append(stressed)
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.int64)
+
+
+def score(backend, X, batch_size=64):
+    return np.concatenate([backend(X[start:start + batch_size]) for start in range(0, len(X), batch_size)])
+
+
+def latency_ms(backend, X, batch_size, repeats=50):
+    """Median latency of one forward pass at the given batch size"""
+    batch = X[:batch_size]
+    backend(batch)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def compare(reference_model, served_model, device, X, y, backends, max_drift):
+    """Drift of every backend (built on served_model) against reference_model run eagerly"""
+    reference = score(create_backend('eager', reference_model, device), X)
+    report = {}
+    for name in backends:
+        backend = create_backend(name, served_model, device)
+        probabilities = score(backend, X)
+
+        drift = np.abs(probabilities - reference)
+        entry = {
+            'max_abs_drift': float(drift.max()),
+            'mean_abs_drift': float(drift.mean()),
+            'decision_flips': int(np.sum((probabilities >= 0.5) != (reference >= 0.5))),
+            'latency_ms_batch1': round(latency_ms(backend, X, 1), 3),
+            'latency_ms_batch32': round(latency_ms(backend, X, min(32, len(X))), 3)
+        }
+        if y is not None and len(np.unique(y)) == 2:
+            entry['auc'] = round(float(roc_auc_score(y, probabilities)), 4)
+        entry['acceptable'] = entry['max_abs_drift'] <= max_drift
+        report[name] = entry
+
+        print(f"  {name:<12} drift max {entry['max_abs_drift']:.2e} mean {entry['mean_abs_drift']:.2e}  "
+              f"flips {entry['decision_flips']}  "
+              f"batch1 {entry['latency_ms_batch1']:.2f}ms  batch32 {entry['latency_ms_batch32']:.2f}ms"
+              + (f"  AUC {entry['auc']:.4f}" if 'auc' in entry else ""))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference backends against the FP32 model")
+    parser.add_argument('--model', default='models/respira_net_v1.pt')
+    parser.add_argument('--scaler', default='models/scaler.pkl')
+    parser.add_argument('--data', default='models/X_mfcc.npy', help="Raw MFCC dataset [N, 13, 100]")
+    parser.add_argument('--labels', default='models/y_risk.npy')
+    parser.add_argument('--holdout', type=float, default=0.2, help="Fraction of the dataset (from the end) to score")
+    parser.add_argument('--synthetic', type=int, default=200, help="Clips to generate if --data does not exist")
+    parser.add_argument('--backends', default=','.join(INFERENCE_BACKENDS))
+    parser.add_argument('--max-drift', type=float, default=0.02, help="Largest acceptable |p - p_fp32|")
+    parser.add_argument('--threads', type=int, default=1, help="torch threads (match AUDIO_WORKER_TORCH_THREADS)")
+    parser.add_argument('--no-fuse', action='store_true', help="Build backends on the unfused model")
+    parser.add_argument('--output', default='backend_report.json')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    # Reference is the model exactly as trained; backends wrap what the API serves (fused by default)
+    engine = UrbanVoiceInference(model_path=args.model, scaler_path=args.scaler, fuse_model=False)
+    if engine.model is None:
+        print("[ERROR] No model loaded; nothing to compare")
+        return
+    served_model = engine.model
+    if not args.no_fuse and not is_fused(engine.model):
+        served_model = fuse_sentinel_net(engine.model)
+
+    if Path(args.data).exists():
+        X, y = load_holdout(args.data, args.labels, args.holdout)
+        source = args.data
+    else:
+        print(f"[WARN] {args.data} not found; generating {args.synthetic} synthetic held-out clips")
+        X, y = synthetic_holdout(args.synthetic)
+        source = 'synthetic'
+    # Raw MFCCs: the scaler runs inside the model
+    X = engine.normalize_batch(X)
+
+    print(f"Comparing backends on {len(X)} held-out clips ({args.threads} torch thread(s))...")
+    report = compare(engine.model, served_model, engine.device, X, y, args.backends.split(','), args.max_drift)
+
+    acceptable = [name for name, entry in report.items() if entry['acceptable']]
+    recommended = min(acceptable, key=lambda name: report[name]['latency_ms_batch1']) if acceptable else 'eager'
+
+    Path(args.output).write_text(json.dumps({
+        'model_digest': engine.model_digest,
+        'fused': is_fused(served_model),
+        'holdout_source': source,
+        'n_clips': len(X),
+        'torch_threads': args.threads,
+        'max_drift': args.max_drift,
+        'recommended_backend': recommended,
+        'backends': report
+    }, indent=2))
+
+    print(f"[OK] Recommended INFERENCE_BACKEND={recommended}")
+    print(f"  Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Streaming vs. buffered ingestion parity report
+Scores the same WAV clips through process_bytes (whole-clip decode) and through
+a chunked StreamingAudioSession, and reports the probability drift and
+risk-level flips between the two paths before STREAMING_INGESTION_ENABLED is turned on
+
+Usage:
+    python ml/compare_streaming.py --model models/respira_net_v1.pt --clips 200
+"""
+
+import argparse
+import io
+import json
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from dataset_generator import UrbanAcousticDatasetGenerator
+from inference_pipeline import UrbanVoiceInference
+
+
+def synthetic_wavs(n_clips, seed=1234):
+    """Balanced generated clips as 16-bit mono WAV bytes"""
+    np.random.seed(seed)
+    generator = UrbanAcousticDatasetGenerator(n_samples=n_clips)
+    clips = []
+    for i in range(n_clips):
+        if i % 2:
+            params = (np.random.uniform(0.03, 0.08), np.random.uniform(0.045, 0.12),
+                      np.random.uniform(150, 400), np.random.randint(1, 21))
+        else:
+            params = (np.random.uniform(0.01, 0.025), np.random.uniform(0.02, 0.04),
+                      np.random.uniform(50, 150), np.random.randint(1, 21))
+        audio = generator.generate_breathing_audio(*params)
+        pcm = (np.clip(audio / max(np.abs(audio).max(), 1e-9), -1, 1) * 32767).astype('<i2')
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(generator.sr)
+            wav.writeframes(pcm.tobytes())
+        clips.append(buffer.getvalue())
+    return clips
+
+
+def score_streamed(engine, data, chunk_bytes):
+    """Probability and risk level for data fed to a streaming session chunk_bytes at a time"""
+    session = engine.create_stream_session()
+    for start in range(0, len(data), chunk_bytes):
+        session.feed(data[start:start + chunk_bytes])
+    features = engine.extract_features_from_stream(session)
+    probability = engine.predict(features['mfcc_normalized'])
+    return probability, engine.calibrate_risk(probability, features['acoustic_features'])['risk_level']
+
+
+def score_buffered(engine, data):
+    features = engine.extract_features_from_bytes(data, '.wav')
+    probability = engine.predict(features['mfcc_normalized'])
+    return probability, engine.calibrate_risk(probability, features['acoustic_features'])['risk_level']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streamed and buffered ingestion on the same WAV clips")
+    parser.add_argument('--model', default='models/respira_net_v1.pt')
+    parser.add_argument('--scaler', default='models/scaler.pkl')
+    parser.add_argument('--clips', type=int, default=200, help="Generated clips to score")
+    parser.add_argument('--chunk-bytes', type=int, default=64 * 1024, help="Match STREAM_CHUNK_BYTES")
+    parser.add_argument('--max-drift', type=float, default=0.05, help="Largest acceptable |p_stream - p_buffered|")
+    parser.add_argument('--output', default='streaming_report.json')
+    args = parser.parse_args()
+
+    engine = UrbanVoiceInference(model_path=args.model, scaler_path=args.scaler)
+    if engine.model is None:
+        print("[ERROR] No model loaded; nothing to compare")
+        return
+
+    print(f"Scoring {args.clips} generated clips through both ingestion paths...")
+    drift, flips = [], []
+    for data in synthetic_wavs(args.clips):
+        buffered_p, buffered_risk = score_buffered(engine, data)
+        streamed_p, streamed_risk = score_streamed(engine, data, args.chunk_bytes)
+        drift.append(abs(streamed_p - buffered_p))
+        flips.append(streamed_risk != buffered_risk)
+    drift = np.array(drift)
+
+    report = {
+        'model_digest': engine.model_digest,
+        'n_clips': args.clips,
+        'chunk_bytes': args.chunk_bytes,
+        'max_abs_drift': float(drift.max()),
+        'mean_abs_drift': float(drift.mean()),
+        'p95_abs_drift': float(np.percentile(drift, 95)),
+        'risk_level_flips': int(sum(flips)),
+        'max_drift': args.max_drift,
+        'acceptable': bool(drift.max() <= args.max_drift)
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+
+    print(f"  drift max {report['max_abs_drift']:.2e} mean {report['mean_abs_drift']:.2e} "
+          f"p95 {report['p95_abs_drift']:.2e}  risk-level flips {report['risk_level_flips']}/{args.clips}")
+    print(f"[{'OK' if report['acceptable'] else 'WARN'}] Streaming drift "
+          f"{'within' if report['acceptable'] else 'exceeds'} {args.max_drift}")
+    print(f"  Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
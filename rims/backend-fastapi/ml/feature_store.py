@@ -0,0 +1,131 @@
+"""
+Persistent feature store for UrbanVoice Sentinel
+Caches DSP output (raw MFCCs + acoustic statistics) keyed by audio hash so clips
+can be re-scored after a model swap or calibration change without redoing DSP
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+# Order of the acoustic statistics columns in the stats shards
+STAT_KEYS = (
+    'mean_centroid', 'std_centroid', 'mean_zcr', 'mean_bandwidth',
+    'mean_rms', 'std_rms', 'mean_flatness', 'silence_ratio'
+)
+
+
+class FeatureStore:
+    """
+    Fixed-size memory-mapped .npy shards plus a SQLite index.
+
+    Layout: <root>/<preprocessing digest>/
+        index.sqlite                  audio digest -> (shard, row)
+        shard_00000_mfcc.npy          [shard_size, 13, 100] float32
+        shard_00000_stats.npy         [shard_size, len(STAT_KEYS)] float64
+
+    Separate directories per preprocessing config mean a config change never
+    serves stale features. Row allocation goes through a SQLite transaction,
+    so several worker processes can share one store.
+    """
+
+    def __init__(self, root, preprocessing_fingerprint, shard_size=1024, mfcc_shape=(13, 100)):
+        config_digest = hashlib.sha256(preprocessing_fingerprint.encode()).hexdigest()[:16]
+        self.path = Path(root) / config_digest
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / 'config.json').write_text(preprocessing_fingerprint)
+
+        self.shard_size = shard_size
+        self.mfcc_shape = tuple(mfcc_shape)
+        self._shards = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path / 'index.sqlite', timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS features (key TEXT PRIMARY KEY, slot INTEGER NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def audio_key(data):
+        """Store key for raw audio bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+    def _shard(self, shard_id):
+        """Open (creating if needed) the memmaps for one shard"""
+        if shard_id not in self._shards:
+            mfcc_path = self.path / f'shard_{shard_id:05d}_mfcc.npy'
+            stats_path = self.path / f'shard_{shard_id:05d}_stats.npy'
+            if not mfcc_path.exists():
+                np.lib.format.open_memmap(mfcc_path, mode='w+', dtype=np.float32,
+                                          shape=(self.shard_size,) + self.mfcc_shape).flush()
+                np.lib.format.open_memmap(stats_path, mode='w+', dtype=np.float64,
+                                          shape=(self.shard_size, len(STAT_KEYS))).flush()
+            self._shards[shard_id] = (
+                np.load(mfcc_path, mmap_mode='r+'),
+                np.load(stats_path, mmap_mode='r+')
+            )
+        return self._shards[shard_id]
+
+    def get(self, key):
+        """Return (mfcc, stats dict) for an audio key, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT slot FROM features WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            mfcc_shard, stats_shard = self._shard(row[0] // self.shard_size)
+            offset = row[0] % self.shard_size
+            mfcc = np.array(mfcc_shard[offset])
+            stats = dict(zip(STAT_KEYS, stats_shard[offset].tolist()))
+        return mfcc, stats
+
+    def put(self, key, mfcc, stats):
+        """Store features for an audio key (no-op if it is already stored)"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if cursor.execute("SELECT 1 FROM features WHERE key = ?", (key,)).fetchone():
+                    cursor.execute("ROLLBACK")
+                    return
+                slot = cursor.execute("SELECT COALESCE(MAX(slot) + 1, 0) FROM features").fetchone()[0]
+                mfcc_shard, stats_shard = self._shard(slot // self.shard_size)
+                offset = slot % self.shard_size
+                mfcc_shard[offset] = mfcc
+                stats_shard[offset] = [stats[name] for name in STAT_KEYS]
+                mfcc_shard.flush()
+                stats_shard.flush()
+                # Only publish the key once its row is written
+                cursor.execute("INSERT INTO features (key, slot) VALUES (?, ?)", (key, slot))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def iter_batches(self, batch_size=256):
+        """Yield (keys, mfcc [B, 13, 100], stats list) over every stored clip in slot order"""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, slot FROM features ORDER BY slot").fetchall()
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            keys, mfccs, stats = [], [], []
+            with self._lock:
+                for key, slot in chunk:
+                    mfcc_shard, stats_shard = self._shard(slot // self.shard_size)
+                    offset = slot % self.shard_size
+                    keys.append(key)
+                    mfccs.append(mfcc_shard[offset])
+                    stats.append(dict(zip(STAT_KEYS, stats_shard[offset].tolist())))
+                mfcc_batch = np.stack(mfccs).astype(np.float32)
+            yield keys, mfcc_batch, stats
+
+    def close(self):
+        with self._lock:
+            self._shards.clear()
+            self._conn.close()
@@ -0,0 +1,146 @@
+"""
+Inference backends for SentinelNet
+Each backend wraps the loaded FP32 model behind the same call:
+[N, 13, 100] float32 array -> [N] probabilities
+"""
+
+import copy
+import os
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+INFERENCE_BACKENDS = ('eager', 'torchscript', 'int8', 'onnx')
+
+
+class EagerBackend:
+    """Plain PyTorch forward pass (reference FP32 behaviour)"""
+
+    name = 'eager'
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+
+    def __call__(self, batch):
+        tensor = torch.from_numpy(np.ascontiguousarray(batch, dtype=np.float32)).to(self.device)
+        with torch.no_grad():
+            return self.model(tensor).view(-1).cpu().numpy()
+
+
+class TorchScriptBackend(EagerBackend):
+    """Traced, frozen graph passed through torch.jit.optimize_for_inference"""
+
+    name = 'torchscript'
+
+    def __init__(self, model, device):
+        # Trace with batch > 1 so nothing gets specialised to a single clip
+        example = torch.randn(2, 13, 100, device=device)
+        with torch.no_grad():
+            traced = torch.jit.trace(model.eval(), example)
+        optimized = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        super().__init__(optimized, device)
+
+
+class DynamicInt8Backend(EagerBackend):
+    """Dynamic INT8 quantization of the nn.LSTM and nn.Linear layers (CPU only)"""
+
+    name = 'int8'
+
+    def __init__(self, model, device):
+        if device.type != 'cpu':
+            print(f"[WARN] INT8 dynamic quantization runs on CPU only; ignoring device {device}")
+        quantized = torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(model).cpu().eval(), {nn.LSTM, nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized, torch.device('cpu'))
+
+
+def export_onnx(model, output_path, opset_version=17):
+    """Export SentinelNet to ONNX with a dynamic batch axis"""
+    example = torch.randn(2, 13, 100)
+    model = copy.deepcopy(model).cpu().eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            model, example, str(output_path),
+            input_names=['mfcc'],
+            output_names=['probability'],
+            dynamic_axes={'mfcc': {0: 'batch'}, 'probability': {0: 'batch'}},
+            opset_version=opset_version,
+            dynamo=False
+        )
+    return output_path
+
+
+class ParityError(ValueError):
+    """A backend's outputs drifted from the PyTorch model by more than the tolerance"""
+
+    def __init__(self, message, max_diff):
+        super().__init__(message)
+        self.max_diff = max_diff
+
+
+def check_parity(backend, model, batch_sizes=(1, 8, 32), atol=1e-4):
+    """Max |backend - PyTorch FP32| over random batches; raises ParityError if it exceeds atol"""
+    reference = EagerBackend(copy.deepcopy(model).cpu().eval(), torch.device('cpu'))
+    generator = np.random.default_rng(0)
+    max_diff = 0.0
+    for batch_size in batch_sizes:
+        batch = generator.standard_normal((batch_size, 13, 100)).astype(np.float32)
+        max_diff = max(max_diff, float(np.abs(backend(batch) - reference(batch)).max()))
+    if max_diff > atol:
+        raise ParityError(f"{backend.name} backend differs from PyTorch by {max_diff:.2e} (atol {atol:.0e})", max_diff)
+    return max_diff
+
+
+class ONNXRuntimeBackend:
+    """
+    ONNX Runtime session over an exported SentinelNet.
+
+    The graph is exported from the loaded weights when onnx_path is missing,
+    and every session is parity-checked against the PyTorch model before use,
+    so a stale .onnx file next to new weights is rejected.
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model, device, onnx_path=None, intra_op_threads=1, inter_op_threads=1):
+        import onnxruntime as ort
+
+        if not onnx_path:
+            onnx_path = os.path.join(tempfile.mkdtemp(prefix='sentinel_onnx_'), 'sentinel_net.onnx')
+        if not os.path.exists(onnx_path):
+            print(f"Exporting ONNX model to {onnx_path}...")
+            export_onnx(model, onnx_path)
+        self.onnx_path = onnx_path
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ['CPUExecutionProvider']
+        if device.type == 'cuda' and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        self.parity_max_diff = check_parity(self, model)
+
+    def __call__(self, batch):
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(['probability'], {'mfcc': batch})[0].reshape(-1)
+
+
+def create_backend(name, model, device, **options):
+    """Build the named backend around an already-loaded FP32 model (options go to the backend)"""
+    backends = {
+        'eager': EagerBackend,
+        'torchscript': TorchScriptBackend,
+        'int8': DynamicInt8Backend,
+        'onnx': ONNXRuntimeBackend
+    }
+    if name not in backends:
+        raise ValueError(f"Unknown inference backend '{name}', expected one of {INFERENCE_BACKENDS}")
+    return backends[name](model, device, **options)
@@ -3,28 +3,61 @@ Production Inference Pipeline for UrbanVoice Sentinel
 Target: <2 seconds total processing time
 """
 
+import io
+import os
+import hashlib
+import tempfile
 import numpy as np
 import librosa
 import torch
-import pickle
 import time
 import json
+import logging
 from pathlib import Path
 
-from model_architecture import create_sentinel_net
+from model_architecture import (
+    create_sentinel_net, NormalizedSentinelNet, fuse_sentinel_net, verify_fused_equivalence, is_fused,
+    sentinel_net_from_state_dict
+)
+from feature_store import FeatureStore
+from mfcc_engine import MFCCEngine
+from inference_backends import create_backend, export_onnx, ONNXRuntimeBackend
+from pipeline_logging import tracing, trace, log_event
 
 
 class AudioProcessor:
     """Audio preprocessing pipeline"""
     
-    def __init__(self, sample_rate=16000):
+    def __init__(self, sample_rate=16000, n_fft=2048, hop_length=512):
         self.sr = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.mfcc_engine = MFCCEngine(sample_rate=sample_rate, n_mfcc=13)
         
     def load_audio(self, file_path):
         """Step 1: Load audio as 16kHz mono"""
         audio, sr = librosa.load(file_path, sr=self.sr, mono=True)
         return audio
     
+    def load_audio_from_buffer(self, data, suffix=None):
+        """Step 1 (in-memory): decode 16kHz mono audio directly from bytes or a memoryview"""
+        try:
+            audio, sr = librosa.load(io.BytesIO(data), sr=self.sr, mono=True)
+            return audio
+        except Exception:
+            # Formats libsndfile can't decode from a stream (e.g. m4a) need a real path for audioread
+            pass
+        
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix or '') as tmp:
+                tmp.write(data)
+                tmp_path = tmp.name
+            return self.load_audio(tmp_path)
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
     def trim_silence(self, audio, threshold=0.5):
         """Step 2: Trim silence with energy threshold"""
         # Calculate energy with fixed hop_length
@@ -55,7 +88,7 @@ class AudioProcessor:
     def spectral_noise_gate(self, audio, threshold_db=-30):
         """Step 3: Spectral noise gating"""
         # Compute STFT
-        stft = librosa.stft(audio)
+        stft = librosa.stft(audio, n_fft=self.n_fft, hop_length=self.hop_length)
         magnitude = np.abs(stft)
         
         # Convert to dB
@@ -66,42 +99,86 @@ class AudioProcessor:
         stft_gated = stft * mask
         
         # Inverse STFT
-        audio_gated = librosa.istft(stft_gated)
+        audio_gated = librosa.istft(stft_gated, n_fft=self.n_fft, hop_length=self.hop_length)
         
         return audio_gated
     
-    def extract_mfcc(self, audio):
-        """Step 4: Extract 13 MFCCs with 100 frames"""
+    def magnitude_spectrogram(self, audio):
+        """Single STFT of the cleaned clip, shared by MFCC and every spectral descriptor"""
+        return np.abs(librosa.stft(audio, n_fft=self.n_fft, hop_length=self.hop_length))
+    
+    def mfcc_power_frames(self, audio, S=None):
+        """Step 4a: [frames, bins] power for the ~100 MFCC frames of one clip
+        
+        With S (magnitude_spectrogram of audio) the frames are picked from S
+        instead of running a second STFT at the clip-specific hop.
+        """
         # Ensure minimum length
         min_length = self.sr * 3  # 3 seconds minimum
-        if len(audio) < min_length:
-            audio = np.pad(audio, (0, min_length - len(audio)), mode='constant')
+        n_samples = max(len(audio), min_length)
         
         # Calculate hop_length to get close to 100 frames
-        hop_length = max(512, int(len(audio) / 100))
-        
-        # Extract MFCCs
-        mfcc = librosa.feature.mfcc(
-            y=audio,
-            sr=self.sr,
-            n_mfcc=13,
-            n_fft=2048,
-            hop_length=hop_length
-        )
+        hop_length = max(512, int(n_samples / 100))
+        
+        if S is None:
+            if len(audio) < min_length:
+                audio = np.pad(audio, (0, min_length - len(audio)), mode='constant')
+            return self.mfcc_engine.power_frames(audio, self.n_fft, hop_length)
+        
+        # Nearest shared-STFT column for each frame centre; frames in the
+        # zero padding past the end of the clip get zero power
+        n_frames = 1 + n_samples // hop_length
+        columns = np.round(np.arange(n_frames) * hop_length / self.hop_length).astype(int)
+        last_audio_column = (len(audio) + self.n_fft // 2 - 1) // self.hop_length
+        S = self._extend_spectrogram(S, audio, min(columns[-1], last_audio_column) + 1)
+        power = np.zeros((n_frames, S.shape[0]), dtype=np.float32)
+        in_range = columns < S.shape[1]
+        power[in_range] = S[:, columns[in_range]].T ** 2
+        return power
+    
+    def mfcc_from_power(self, powers):
+        """Step 4b: 13 x 100 MFCCs for a list of [frames, bins] powers in one vectorized call"""
+        # Repeating the last frame is the same as edge-padding the MFCC columns,
+        # and leaves each clip's top_db peak untouched
+        n_frames = max(100, max(len(power) for power in powers))
+        stacked = np.empty((len(powers), n_frames, powers[0].shape[1]), dtype=np.float32)
+        for row, power in zip(stacked, powers):
+            row[:len(power)] = power
+            row[len(power):] = power[-1]
         
         # Ensure exactly 100 frames
-        if mfcc.shape[1] < 100:
-            mfcc = np.pad(mfcc, ((0, 0), (0, 100 - mfcc.shape[1])), mode='edge')
-        elif mfcc.shape[1] > 100:
-            mfcc = mfcc[:, :100]
-        
-        return mfcc
+        return self.mfcc_engine.mfcc(stacked, self.n_fft)[:, :, :100]
+    
+    def extract_mfcc(self, audio, S=None):
+        """Step 4: Extract 13 MFCCs with 100 frames"""
+        return self.mfcc_from_power([self.mfcc_power_frames(audio, S)])[0]
+    
+    def _extend_spectrogram(self, S, audio, n_columns):
+        """Add the frames that straddle the end of the clip and the 3s zero padding"""
+        if n_columns <= S.shape[1]:
+            return S
+        padded = np.pad(audio, (self.n_fft // 2, n_columns * self.hop_length + self.n_fft))
+        frames = librosa.util.frame(
+            padded[S.shape[1] * self.hop_length:], frame_length=self.n_fft, hop_length=self.hop_length, axis=0
+        )[:n_columns - S.shape[1]]
+        tail = np.abs(np.fft.rfft(frames * self.mfcc_engine.window(self.n_fft), axis=-1)).astype(S.dtype)
+        return np.hstack([S, tail.T])
     
     def calculate_acoustic_features(self, audio):
         """Calculate acoustic features using PROVEN health signatures and environmental indicators"""
+        return self.score_acoustic_stats(self.measure_acoustic_stats(audio))
+    
+    def measure_acoustic_stats(self, audio, S=None):
+        """Clip-level spectral/energy measurements that feed the acoustic risk rules
+        
+        Pass S (magnitude spectrogram of audio) to reuse an existing STFT for the
+        spectral descriptors.
+        """
+        if S is None:
+            S = self.magnitude_spectrogram(audio)
         
         # 1. Spectral Centroid - frequency distribution (Hz)
-        spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=self.sr)[0]
+        spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=self.sr)[0]
         mean_centroid = np.mean(spectral_centroids)
         std_centroid = np.std(spectral_centroids)
         
@@ -110,7 +187,7 @@ class AudioProcessor:
         mean_zcr = np.mean(zcr)
         
         # 3. Spectral Bandwidth - frequency spread
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=self.sr)[0]
+        spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=self.sr, centroid=spectral_centroids[np.newaxis])[0]
         mean_bandwidth = np.mean(spectral_bandwidth)
         
         # 4. RMS Energy - loudness variation
@@ -119,15 +196,31 @@ class AudioProcessor:
         std_rms = np.std(rms)
         
         # 5. Spectral Flatness - noise vs tonal
-        spectral_flatness = librosa.feature.spectral_flatness(y=audio)[0]
+        spectral_flatness = librosa.feature.spectral_flatness(S=S)[0]
         mean_flatness = np.mean(spectral_flatness)
         
-        print(f"  [Audio Analysis]")
-        print(f"    Centroid: {mean_centroid:.0f} Hz (std: {std_centroid:.0f})")
-        print(f"    ZCR: {mean_zcr:.4f}")
-        print(f"    Bandwidth: {mean_bandwidth:.0f} Hz")
-        print(f"    RMS: {mean_rms:.4f} (std: {std_rms:.4f})")
-        print(f"    Flatness: {mean_flatness:.4f}")
+        # Silence ratio (same RMS frames)
+        silence_threshold = 0.15 * np.max(rms)
+        silence_ratio = np.sum(rms < silence_threshold) / len(rms)
+        
+        return {
+            'mean_centroid': float(mean_centroid),
+            'std_centroid': float(std_centroid),
+            'mean_zcr': float(mean_zcr),
+            'mean_bandwidth': float(mean_bandwidth),
+            'mean_rms': float(mean_rms),
+            'std_rms': float(std_rms),
+            'mean_flatness': float(mean_flatness),
+            'silence_ratio': float(silence_ratio)
+        }
+    
+    def score_acoustic_stats(self, stats):
+        """Turn clip-level acoustic measurements into jitter/shimmer/silence features"""
+        mean_centroid = stats['mean_centroid']
+        std_centroid = stats['std_centroid']
+        mean_zcr = stats['mean_zcr']
+        mean_bandwidth = stats['mean_bandwidth']
+        mean_flatness = stats['mean_flatness']
         
         # Calculate risk score based on MULTIPLE indicators
         risk_score = 0
@@ -136,7 +229,6 @@ class AudioProcessor:
         # SPECIAL HANDLING: If audio is very low frequency (<500 Hz), it's likely not breathing
         # Use alternative analysis for demo purposes
         if mean_centroid < 500:
-            print(f"    NOTE: Low frequency audio detected - using alternative analysis")
             # Analyze based on what we have
             # Use bandwidth and flatness as proxies
             if mean_bandwidth > 400 and std_centroid > 150:
@@ -184,33 +276,38 @@ class AudioProcessor:
                 risk_score += 0.15
                 indicators.append("Tonal quality (whistle-like)")
         
-        print(f"    Risk Score: {risk_score:.2f}")
-        print(f"    Indicators: {', '.join(indicators) if indicators else 'None detected'}")
+        if tracing():
+            trace("acoustic_analysis", **stats, low_frequency=bool(mean_centroid < 500),
+                  risk_score=round(risk_score, 4), indicators=indicators)
         
         # Map to jitter/shimmer for compatibility
         jitter = min(risk_score * 0.12, 0.12)
         shimmer = min(risk_score * 0.15, 0.15)
         
-        # Silence ratio
-        energy = librosa.feature.rms(y=audio)[0]
-        silence_threshold = 0.15 * np.max(energy)
-        silence_ratio = np.sum(energy < silence_threshold) / len(energy)
-        
         return {
             'jitter': float(jitter),
             'shimmer': float(shimmer),
-            'silence_ratio': float(silence_ratio)
+            'silence_ratio': float(stats['silence_ratio'])
         }
 
 
 class UrbanVoiceInference:
     """Production inference pipeline"""
     
-    def __init__(self, model_path='models/sentinel_net_v1.pt', scaler_path='models/scaler.pkl'):
+    def __init__(self, model_path='models/sentinel_net_v1.pt', scaler_path='models/scaler.pkl', feature_store_dir=None,
+                 backend='eager', backend_options=None, fuse_model=True):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.audio_processor = AudioProcessor()
         self.model = None
-        self.scaler = None
+        self.backend = None
+        self.model_digest = None
+        # Milliseconds spent in each initialization phase (startup report)
+        self.init_timing = {}
+        phase_start = time.perf_counter()
+        
+        # Preprocessing parameters (part of the result cache fingerprint)
+        self.trim_threshold = 0.5
+        self.noise_gate_db = -30
         
         # Robust path detection
         base_dir = Path(__file__).parent.parent
@@ -232,62 +329,135 @@ class UrbanVoiceInference:
         if actual_model_path:
             try:
                 print(f"Loading model from {actual_model_path}...")
-                self.model = create_sentinel_net()
-                self.model.load_state_dict(torch.load(actual_model_path, map_location=self.device))
+                # Plain, fused (export_fused_model) or serving (export_serving_model) weights
+                self.model = sentinel_net_from_state_dict(torch.load(actual_model_path, map_location=self.device))
                 self.model.to(self.device)
                 self.model.eval()
+                self.model_digest = hashlib.sha256(actual_model_path.read_bytes()).hexdigest()[:16]
                 print("[OK] Neural Model loaded successfully")
             except Exception as e:
                 print(f"[WARN] Failed to load neural model: {e}. Falling back to acoustic-only mode.")
                 self.model = None
         else:
             print("[WARN] No model file found. Falling back to acoustic-only mode.")
-
-        # Load scaler
-        actual_scaler_path = None
-        possible_scaler_paths = [Path(scaler_path), base_dir / scaler_path, base_dir / 'models/scaler.pkl']
-        for p in possible_scaler_paths:
-            if p.exists():
-                actual_scaler_path = p
-                break
-                
-        if actual_scaler_path and self.model:
+        phase_start = self._record_phase('model_load', phase_start)
+        
+        # Weights without a baked-in scaler: fold the pickled StandardScaler in as the first layer
+        if self.model and not isinstance(self.model, NormalizedSentinelNet):
+            self.model = self._attach_scaler(self.model, [Path(scaler_path), base_dir / scaler_path])
+        phase_start = self._record_phase('scaler', phase_start)
+        
+        # Serve the BatchNorm-folded variant unless told not to
+        if self.model and fuse_model and not is_fused(self.model):
+            try:
+                fused = fuse_sentinel_net(self.model)
+                max_diff = verify_fused_equivalence(self.model, fused)
+                self.model = fused
+                print(f"[OK] BatchNorm folded into conv/linear layers (max |diff| {max_diff:.1e})")
+            except Exception as e:
+                print(f"[WARN] Failed to fuse model: {e}. Serving the unfused model.")
+        phase_start = self._record_phase('fuse', phase_start)
+        
+        # Wrap the FP32 model in the configured inference backend
+        if self.model:
             try:
-                print(f"Loading scaler from {actual_scaler_path}...")
-                with open(actual_scaler_path, 'rb') as f:
-                    self.scaler = pickle.load(f)
+                self.backend = create_backend(backend, self.model, self.device, **(backend_options or {}))
+                print(f"[OK] Inference backend: {self.backend.name}")
             except Exception as e:
-                print(f"[WARN] Failed to load scaler: {e}")
-                self.scaler = None
+                # e.g. a stale or un-normalized .onnx file failing the parity check
+                log_event(logging.WARNING, "inference_backend_fallback", backend=backend, fallback="eager",
+                          error=str(e), parity_max_diff=getattr(e, 'max_diff', None))
+                self.backend = create_backend('eager', self.model, self.device)
+        phase_start = self._record_phase('backend', phase_start)
+
+        # Optional persistent store of DSP output keyed by audio hash
+        self.feature_store = None
+        if feature_store_dir:
+            self.feature_store = FeatureStore(feature_store_dir, self.preprocessing_fingerprint())
+            print(f"[OK] Feature store attached at {self.feature_store.path} ({len(self.feature_store)} clips)")
+        phase_start = self._record_phase('feature_store', phase_start)
+        
+        # librosa loads its submodules (and scipy) on first attribute access; pay that here, not on the first request
+        import librosa.core, librosa.effects, librosa.feature, librosa.filters
+        self._record_phase('dsp_imports', phase_start)
         
         if not self.model:
             print("[INFO] Inference engine initialized in ACOUSTIC-ONLY mode")
         else:
             print("[OK] Inference engine fully initialized")
         
+    def _record_phase(self, name, phase_start):
+        """Store the elapsed time of an init phase and return the start of the next one"""
+        now = time.perf_counter()
+        self.init_timing[f'{name}_ms'] = round((now - phase_start) * 1000, 1)
+        return now
+    
+    def _attach_scaler(self, model, possible_scaler_paths):
+        """Wrap model with the normalization layer built from a pickled StandardScaler (legacy artifacts)"""
+        actual_scaler_path = next((p for p in possible_scaler_paths if p.exists()), None)
+        if actual_scaler_path is None:
+            return model
+        
+        try:
+            # Unpickling imports sklearn; export_serving_model() bakes the scaler into the weights instead
+            import pickle
+            print(f"Loading scaler from {actual_scaler_path}...")
+            with open(actual_scaler_path, 'rb') as f:
+                scaler = pickle.load(f)
+            normalized = NormalizedSentinelNet(model, scaler.mean_, scaler.scale_).to(self.device).eval()
+            print("[WARN] Scaler loaded from pickle; build the serving model with export_serving_model() to drop sklearn from startup")
+            return normalized
+        except Exception as e:
+            print(f"[WARN] Failed to load scaler: {e}")
+            return model
+    
+    @property
+    def model_version(self):
+        return 'v1.2.1' if self.model else 'acoustic-fallback-v1'
+    
+    def preprocessing_fingerprint(self):
+        """Identifies the DSP configuration; features depend on nothing else"""
+        return json.dumps({
+            'sample_rate': self.audio_processor.sr,
+            'trim_threshold': self.trim_threshold,
+            'noise_gate_db': self.noise_gate_db,
+            'n_mfcc': 13,
+            'n_fft': 2048,
+            'mfcc_frames': 100,
+            'mfcc_source': 'shared_stft'
+        }, sort_keys=True)
+    
+    def cache_fingerprint(self):
+        """Identifies everything besides the audio bytes that determines a result"""
+        return json.dumps({
+            'model_version': self.model_version,
+            'model_digest': self.model_digest,
+            'backend': self.backend.name if self.backend else None,
+            'fused': is_fused(self.model),
+            'scaler': isinstance(self.model, NormalizedSentinelNet),
+            'preprocessing': json.loads(self.preprocessing_fingerprint())
+        }, sort_keys=True)
+    
     def normalize_features(self, mfcc):
-        """Step 5: Z-score normalize using precomputed scaler"""
-        if self.scaler is None:
-            return mfcc
-        mfcc_flat = mfcc.reshape(1, -1)
-        mfcc_normalized = self.scaler.transform(mfcc_flat)
-        mfcc_normalized = mfcc_normalized.reshape(mfcc.shape)
-        return mfcc_normalized
+        """Step 5: prepare model input; the z-score itself runs inside the model (FeatureNormalization)"""
+        return np.asarray(mfcc, dtype=np.float32)
+    
+    def normalize_batch(self, mfcc_batch):
+        """Step 5 (batched): model input for a stacked [N, 13, 100] array"""
+        return np.asarray(mfcc_batch, dtype=np.float32)
     
     def predict(self, mfcc):
-        """Step 6: TorchScript model inference"""
+        """Step 6: Model inference"""
+        return self.predict_batch([mfcc])[0]
+    
+    def predict_batch(self, mfcc_batch):
+        """Step 6 (batched): single forward pass over stacked [N, 13, 100] MFCCs"""
         if self.model is None:
             # Fallback to a neutral probability if model is missing
-            return 0.5
-            
-        # Convert to tensor
-        mfcc_tensor = torch.FloatTensor(mfcc).unsqueeze(0).to(self.device)
+            return [0.5] * len(mfcc_batch)
         
-        # Inference
-        with torch.no_grad():
-            probability = self.model(mfcc_tensor).item()
-        
-        return probability
+        # Stack into one [N, 13, 100] array and run the configured backend
+        return self.backend(np.stack(mfcc_batch).astype(np.float32)).tolist()
     
     def calibrate_risk(self, probability, acoustic_features):
         """Step 7: Calibrate probability to risk class with acoustic boost"""
@@ -297,45 +467,28 @@ class UrbanVoiceInference:
         shimmer = acoustic_features.get('shimmer', 0)
         silence_ratio = acoustic_features.get('silence_ratio', 0)
         
-        # DEBUG: Print actual values
-        print(f"DEBUG - Jitter: {jitter:.4f}, Shimmer: {shimmer:.4f}, Silence: {silence_ratio:.4f}")
-        
         # Calculate acoustic risk score (0-1)
         acoustic_risk = 0
         
         # Jitter analysis (voice frequency instability)
         if jitter > 0.05:  # Very high - severe distress
             acoustic_risk += 0.5
-            print("  -> High jitter detected (+0.5)")
         elif jitter > 0.035:  # High - moderate distress
             acoustic_risk += 0.3
-            print("  -> Moderate jitter detected (+0.3)")
         elif jitter > 0.025:  # Slightly elevated
             acoustic_risk += 0.15
-            print("  -> Slight jitter detected (+0.15)")
-        else:
-            print("  -> Normal jitter (no boost)")
         
         # Shimmer analysis (voice amplitude instability)
         if shimmer > 0.08:  # Very high
             acoustic_risk += 0.5
-            print("  -> High shimmer detected (+0.5)")
         elif shimmer > 0.055:  # High
             acoustic_risk += 0.3
-            print("  -> Moderate shimmer detected (+0.3)")
         elif shimmer > 0.042:  # Slightly elevated
             acoustic_risk += 0.15
-            print("  -> Slight jitter detected (+0.15)")
-        else:
-            print("  -> Normal shimmer (no boost)")
         
         # Silence ratio (breathing interruptions)
         if silence_ratio > 0.3:  # Too much silence = labored breathing
             acoustic_risk += 0.2
-            print("  -> High silence ratio detected (+0.2)")
-        
-        print(f"  -> Total acoustic risk: {acoustic_risk:.2f}")
-        print(f"  -> Model probability: {probability:.4f}")
         
         # Use acoustic analysis primarily (model was trained on synthetic data)
         # If acoustic risk is detected, trust it
@@ -346,7 +499,10 @@ class UrbanVoiceInference:
         else:
             final_probability = (probability * 0.5) + (acoustic_risk * 0.5)  # Balanced
         
-        print(f"  -> Final probability: {final_probability:.4f} ({final_probability*100:.1f}%)")
+        if tracing():
+            trace("calibrate_risk", jitter=jitter, shimmer=shimmer, silence_ratio=silence_ratio,
+                  acoustic_risk=round(acoustic_risk, 4), model_probability=round(probability, 6),
+                  final_probability=round(final_probability, 6))
         
         # Classify based on final probability
         if final_probability >= 0.70:
@@ -369,88 +525,305 @@ class UrbanVoiceInference:
             'color': color
         }
     
+    def extract_features(self, file_path):
+        """Steps 1-5: load, clean, featurize and normalize one audio file"""
+        return self.complete_features([self.prepare_features(file_path)])[0]
+    
+    def prepare_features(self, file_path):
+        """Steps 1-3 and acoustic stats for one audio file (MFCCs are left to complete_features)"""
+        # Step 1: Load audio
+        step1_start = time.time()
+        audio = self.audio_processor.load_audio(file_path)
+        step1_time = (time.time() - step1_start) * 1000
+        
+        return self._prepare(audio, step1_time)
+    
+    def extract_features_from_bytes(self, data, suffix=None):
+        """Steps 1-5 for an in-memory upload (no temp file round-trip)"""
+        return self.complete_features([self.prepare_features_from_bytes(data, suffix)])[0]
+    
+    def prepare_features_from_bytes(self, data, suffix=None):
+        """prepare_features for in-memory audio; a feature store hit comes back already complete"""
+        store_key = None
+        if self.feature_store is not None:
+            lookup_start = time.time()
+            store_key = FeatureStore.audio_key(data)
+            stored = self.feature_store.get(store_key)
+            if stored is not None:
+                # Same audio, same DSP config: skip all DSP work
+                return self.features_from_stored(*stored, lookup_ms=(time.time() - lookup_start) * 1000)
+        
+        step1_start = time.time()
+        audio = self.audio_processor.load_audio_from_buffer(data, suffix)
+        step1_time = (time.time() - step1_start) * 1000
+        
+        prepared = self._prepare(audio, step1_time)
+        prepared['store_key'] = store_key
+        return prepared
+    
+    def features_from_stored(self, mfcc, stats, lookup_ms=0.0):
+        """Rebuild a features dict from stored MFCCs and acoustic statistics"""
+        step5_start = time.time()
+        mfcc_normalized = self.normalize_features(mfcc)
+        step5_time = (time.time() - step5_start) * 1000
+        
+        return {
+            'mfcc': mfcc,
+            'mfcc_normalized': mfcc_normalized,
+            'acoustic_stats': stats,
+            'acoustic_features': self.audio_processor.score_acoustic_stats(stats),
+            'pipeline_timing': {
+                'feature_store_ms': round(lookup_ms, 2),
+                'normalize_ms': round(step5_time, 2)
+            }
+        }
+    
+    def create_stream_session(self):
+        """Start an incremental decode/feature session for a streamed WAV upload"""
+        # Imported on first use: scipy.signal alone is ~1s of cold start
+        from audio_streaming import StreamingAudioSession
+        return StreamingAudioSession(sample_rate=self.audio_processor.sr, threshold_db=self.noise_gate_db)
+    
+    def create_live_session(self, input_sr=16000, encoding='pcm_s16le', window_seconds=3.0, hop_seconds=0.5):
+        """Start a sliding-window analyzer for a live PCM stream"""
+        from audio_streaming import SlidingWindowAnalyzer
+        return SlidingWindowAnalyzer(
+            input_sr=input_sr,
+            sample_rate=self.audio_processor.sr,
+            encoding=encoding,
+            window_seconds=window_seconds,
+            hop_seconds=hop_seconds,
+            threshold_db=self.noise_gate_db
+        )
+    
+    def extract_features_from_stream(self, session):
+        """Steps 4-5 for a finished streaming session (decode and framing already happened as chunks arrived)"""
+        finalize_start = time.time()
+        mfcc, stats = session.finish()
+        acoustic_features = self.audio_processor.score_acoustic_stats(stats)
+        finalize_time = (time.time() - finalize_start) * 1000
+        
+        step5_start = time.time()
+        mfcc_normalized = self.normalize_features(mfcc)
+        step5_time = (time.time() - step5_start) * 1000
+        
+        return {
+            'mfcc': mfcc,
+            'mfcc_normalized': mfcc_normalized,
+            'acoustic_stats': stats,
+            'acoustic_features': acoustic_features,
+            'pipeline_timing': {
+                'stream_decode_ms': round(session.decode_ms, 2),
+                'stream_features_ms': round(session.features_ms, 2),
+                'stream_finalize_ms': round(finalize_time, 2),
+                'normalize_ms': round(step5_time, 2)
+            }
+        }
+    
+    def _prepare(self, audio, step1_time):
+        """Steps 2-3, the shared STFT, MFCC frame powers and acoustic stats on decoded audio"""
+        # Step 2: Trim silence
+        step2_start = time.time()
+        audio = self.audio_processor.trim_silence(audio, threshold=self.trim_threshold)
+        step2_time = (time.time() - step2_start) * 1000
+        
+        # Step 3: Spectral noise gating
+        step3_start = time.time()
+        audio = self.audio_processor.spectral_noise_gate(audio, threshold_db=self.noise_gate_db)
+        step3_time = (time.time() - step3_start) * 1000
+        
+        # One STFT of the gated clip, consumed by the MFCCs and every spectral descriptor
+        stft_start = time.time()
+        spectrogram = self.audio_processor.magnitude_spectrogram(audio)
+        mfcc_power = self.audio_processor.mfcc_power_frames(audio, S=spectrogram)
+        stft_time = (time.time() - stft_start) * 1000
+        
+        # Calculate acoustic features
+        acoustic_start = time.time()
+        acoustic_stats = self.audio_processor.measure_acoustic_stats(audio, S=spectrogram)
+        acoustic_features = self.audio_processor.score_acoustic_stats(acoustic_stats)
+        acoustic_time = (time.time() - acoustic_start) * 1000
+        
+        return {
+            'mfcc_power': mfcc_power,
+            'acoustic_stats': acoustic_stats,
+            'acoustic_features': acoustic_features,
+            'pipeline_timing': {
+                'load_audio_ms': round(step1_time, 2),
+                'trim_silence_ms': round(step2_time, 2),
+                'noise_gate_ms': round(step3_time, 2),
+                'spectrogram_ms': round(stft_time, 2),
+                'acoustic_features_ms': round(acoustic_time, 2)
+            }
+        }
+    
+    def complete_features(self, prepared):
+        """Steps 4-5 for prepared clips: one vectorized MFCC call and one scaler call for all of them"""
+        pending = [features for features in prepared if 'mfcc' not in features]
+        if not pending:
+            return prepared
+        
+        # Step 4: Extract MFCCs
+        step4_start = time.time()
+        mfccs = self.audio_processor.mfcc_from_power([features.pop('mfcc_power') for features in pending])
+        step4_time = (time.time() - step4_start) * 1000
+        
+        # Step 5: Normalize
+        step5_start = time.time()
+        mfccs_normalized = self.normalize_batch(mfccs)
+        step5_time = (time.time() - step5_start) * 1000
+        
+        for features, mfcc, mfcc_normalized in zip(pending, mfccs, mfccs_normalized):
+            features['mfcc'] = mfcc
+            features['mfcc_normalized'] = mfcc_normalized
+            features['pipeline_timing']['extract_mfcc_ms'] = round(step4_time, 2)
+            features['pipeline_timing']['normalize_ms'] = round(step5_time, 2)
+            store_key = features.pop('store_key', None)
+            if store_key is not None:
+                self.feature_store.put(store_key, mfcc, features['acoustic_stats'])
+        
+        return prepared
+    
+    def build_result(self, features, probability, inference_ms, start_time):
+        """Step 7: calibrate risk and compile the response for one clip"""
+        step7_start = time.time()
+        risk_result = self.calibrate_risk(probability, features['acoustic_features'])
+        step7_time = (time.time() - step7_start) * 1000
+        
+        total_time = (time.time() - start_time) * 1000
+        
+        acoustic_features = features['acoustic_features']
+        pipeline_timing = dict(features['pipeline_timing'])
+        pipeline_timing['inference_ms'] = round(inference_ms, 2)
+        pipeline_timing['calibrate_ms'] = round(step7_time, 2)
+        
+        return {
+            'risk_level': risk_result['risk_level'],
+            'confidence': risk_result['confidence'],
+            'recommendation': risk_result['recommendation'],
+            'color': risk_result['color'],
+            'model_version': self.model_version,
+            'processing_time_ms': round(total_time, 2),
+            'features': {
+                'jitter': acoustic_features['jitter'],
+                'shimmer': acoustic_features['shimmer'],
+                'mfcc_mean': features['mfcc'].mean(axis=1).tolist(),
+                'silence_ratio': acoustic_features['silence_ratio']
+            },
+            'pipeline_timing': pipeline_timing
+        }
+    
+    def error_result(self, error, start_time):
+        """Result payload for a clip the pipeline could not process"""
+        return {
+            'error': str(error),
+            'risk_level': 'ERROR',
+            'confidence': 0,
+            'processing_time_ms': (time.time() - start_time) * 1000
+        }
+    
     def process_audio(self, file_path):
         """
         Complete 7-step production inference pipeline
         Target: <2 seconds total time
         """
+        return self._process(self.extract_features, file_path)
+    
+    def process_bytes(self, data, suffix=None):
+        """
+        Complete pipeline for audio already in memory (bytes, bytearray or memoryview).
+        suffix is the original file extension, used only if the format needs a temp file.
+        """
+        return self._process(self.extract_features_from_bytes, data, suffix)
+    
+    def _process(self, extract, *args):
         start_time = time.time()
         
         try:
-            # Step 1: Load audio
-            step1_start = time.time()
-            audio = self.audio_processor.load_audio(file_path)
-            step1_time = (time.time() - step1_start) * 1000
-            
-            # Step 2: Trim silence
-            step2_start = time.time()
-            audio = self.audio_processor.trim_silence(audio, threshold=0.5)
-            step2_time = (time.time() - step2_start) * 1000
-            
-            # Step 3: Spectral noise gating
-            step3_start = time.time()
-            audio = self.audio_processor.spectral_noise_gate(audio, threshold_db=-30)
-            step3_time = (time.time() - step3_start) * 1000
-            
-            # Step 4: Extract MFCCs
-            step4_start = time.time()
-            mfcc = self.audio_processor.extract_mfcc(audio)
-            step4_time = (time.time() - step4_start) * 1000
-            
-            # Calculate acoustic features
-            acoustic_features = self.audio_processor.calculate_acoustic_features(audio)
-            
-            # Step 5: Normalize
-            step5_start = time.time()
-            mfcc_normalized = self.normalize_features(mfcc)
-            step5_time = (time.time() - step5_start) * 1000
+            # Steps 1-5: Load, clean, featurize, normalize
+            features = extract(*args)
             
             # Step 6: Model inference
             step6_start = time.time()
-            probability = self.predict(mfcc_normalized)
+            probability = self.predict(features['mfcc_normalized'])
             step6_time = (time.time() - step6_start) * 1000
             
-            # Step 7: Calibrate risk
-            step7_start = time.time()
-            risk_result = self.calibrate_risk(probability, acoustic_features)
-            step7_time = (time.time() - step7_start) * 1000
-            
-            total_time = (time.time() - start_time) * 1000
-            
-            # Compile result
-            result = {
-                'risk_level': risk_result['risk_level'],
-                'confidence': risk_result['confidence'],
-                'recommendation': risk_result['recommendation'],
-                'color': risk_result['color'],
-                'model_version': 'v1.2.1' if self.model else 'acoustic-fallback-v1',
-                'processing_time_ms': round(total_time, 2),
-                'features': {
-                    'jitter': acoustic_features['jitter'],
-                    'shimmer': acoustic_features['shimmer'],
-                    'mfcc_mean': mfcc.mean(axis=1).tolist(),
-                    'silence_ratio': acoustic_features['silence_ratio']
-                },
-                'pipeline_timing': {
-                    'load_audio_ms': round(step1_time, 2),
-                    'trim_silence_ms': round(step2_time, 2),
-                    'noise_gate_ms': round(step3_time, 2),
-                    'extract_mfcc_ms': round(step4_time, 2),
-                    'normalize_ms': round(step5_time, 2),
-                    'inference_ms': round(step6_time, 2),
-                    'calibrate_ms': round(step7_time, 2)
-                }
-            }
-            
-            return result
+            # Step 7: Calibrate risk and compile result
+            return self.build_result(features, probability, step6_time, start_time)
             
         except Exception as e:
-            return {
-                'error': str(e),
-                'risk_level': 'ERROR',
-                'confidence': 0,
-                'processing_time_ms': (time.time() - start_time) * 1000
-            }
+            return self.error_result(e, start_time)
+    
+    def process_batch(self, file_paths):
+        """
+        Batched pipeline: featurize every file, then run ONE forward pass
+        over the stacked [N, 13, 100] tensor. Returns one result per input,
+        in order; files that fail feature extraction get an error result.
+        """
+        return self._process_batch(self.prepare_features, [(path,) for path in file_paths])
+    
+    def process_bytes_batch(self, items):
+        """Batched pipeline for in-memory uploads; items are (data, suffix) pairs"""
+        return self._process_batch(self.prepare_features_from_bytes, items)
+    
+    def _process_batch(self, prepare, arg_tuples):
+        batch_start = time.time()
+        results = [None] * len(arg_tuples)
+        extracted = []
+        
+        # Steps 1-3 per file
+        for index, args in enumerate(arg_tuples):
+            start_time = time.time()
+            try:
+                features = prepare(*args)
+                extracted.append((index, features, time.time() - start_time))
+            except Exception as e:
+                results[index] = self.error_result(e, start_time)
+        
+        if not extracted:
+            return results
+        
+        # Steps 4-5 for the whole batch: one vectorized MFCC call over [N, frames, bins]
+        complete_start = time.time()
+        try:
+            self.complete_features([features for _, features, _ in extracted])
+        except Exception as e:
+            for index, _, extract_seconds in extracted:
+                results[index] = self.error_result(e, time.time() - extract_seconds)
+            return results
+        complete_seconds = time.time() - complete_start
+        extracted = [(index, features, extract_seconds + complete_seconds)
+                     for index, features, extract_seconds in extracted]
+        
+        # Step 6: one forward pass for the whole batch
+        step6_start = time.time()
+        probabilities = self.predict_batch([features['mfcc_normalized'] for _, features, _ in extracted])
+        step6_time = (time.time() - step6_start) * 1000
+        
+        # Step 7 per file; each clip is charged its own DSP time plus the shared forward pass
+        for (index, features, extract_seconds), probability in zip(extracted, probabilities):
+            start_time = time.time() - extract_seconds - step6_time / 1000
+            result = self.build_result(features, probability, step6_time, start_time)
+            result['batch_size'] = len(extracted)
+            results[index] = result
+        
+        log_event(logging.INFO, "batch_processed", batch_size=len(extracted),
+                  total_ms=round((time.time() - batch_start) * 1000, 1), forward_ms=round(step6_time, 1))
+        
+        return results
+
+
+def save_state_dict(state_dict, output_path):
+    """torch.save via a temp file + rename, so a worker never loads a half-written file"""
+    output_path = Path(output_path)
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        torch.save({key: value.cpu() for key, value in state_dict.items()}, tmp_path)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def convert_to_torchscript(model_path='models/sentinel_net_v1.pt', output_path='models/sentinel_net_ts.pt'):
@@ -480,13 +853,85 @@ def convert_to_torchscript(model_path='models/sentinel_net_v1.pt', output_path='
     print(f"Verification output range: [{output.min():.4f}, {output.max():.4f}]")
 
 
+def export_fused_model(model_path='models/sentinel_net_v1.pt', output_path='models/sentinel_net_fused.pt'):
+    """Fold BatchNorm into conv/linear weights, strip dropout and save the inference-only model"""
+    print("Exporting fused inference model...")
+    
+    # Load model
+    model = create_sentinel_net()
+    model.load_state_dict(torch.load(model_path, map_location='cpu'))
+    model.eval()
+    
+    # Fold and check against the original on batches of 1, 8 and 32
+    fused = fuse_sentinel_net(model)
+    max_diff = verify_fused_equivalence(model, fused)
+    
+    torch.save(fused.state_dict(), output_path)
+    print(f"[OK] Fused model saved to {output_path} (max |diff| vs original {max_diff:.2e})")
+
+
+def export_serving_model(model_path='models/sentinel_net_v1.pt', scaler_path='models/scaler.pkl',
+                         output_path='models/sentinel_net_serving.pt'):
+    """Bake the StandardScaler into the fused model so serving needs neither sklearn nor pickle"""
+    import pickle
+    print("Exporting serving model (scaler + folded BatchNorm)...")
+    
+    # Load model and scaler
+    model = create_sentinel_net()
+    model.load_state_dict(torch.load(model_path, map_location='cpu'))
+    model.eval()
+    with open(scaler_path, 'rb') as f:
+        scaler = pickle.load(f)
+    
+    # Fold BatchNorm, then prepend the normalization layer
+    serving = NormalizedSentinelNet(fuse_sentinel_net(model), scaler.mean_, scaler.scale_).eval()
+    
+    # Verify against the original two-step path: sklearn transform, then the unfused model
+    generator = np.random.default_rng(0)
+    raw = (generator.standard_normal((32, 1300)) * scaler.scale_ + scaler.mean_).astype(np.float32)
+    with torch.no_grad():
+        expected = model(torch.from_numpy(scaler.transform(raw).astype(np.float32).reshape(-1, 13, 100)))
+        actual = serving(torch.from_numpy(raw.reshape(-1, 13, 100)))
+    max_diff = (expected - actual).abs().max().item()
+    
+    save_state_dict(serving.state_dict(), output_path)
+    print(f"[OK] Serving model saved to {output_path} (max |diff| vs scaler + original {max_diff:.2e})")
+
+
+def convert_to_onnx(model_path='models/respira_net_v1.pt', scaler_path='models/scaler.pkl',
+                    output_path='models/respira_net_v1.onnx'):
+    """Export the served model (scaler + folded BatchNorm) to ONNX (dynamic batch axis) and check it against PyTorch"""
+    print("Converting serving model to ONNX...")
+    
+    # Same graph the API serves: raw or serving weights, normalization first, BatchNorm folded
+    model = sentinel_net_from_state_dict(torch.load(model_path, map_location='cpu'))
+    if not isinstance(model, NormalizedSentinelNet):
+        import pickle
+        with open(scaler_path, 'rb') as f:
+            scaler = pickle.load(f)
+        model = NormalizedSentinelNet(model, scaler.mean_, scaler.scale_)
+    model = model.eval() if is_fused(model) else fuse_sentinel_net(model.eval())
+    
+    # Export with a dynamic batch axis
+    export_onnx(model, output_path)
+    print(f"[OK] ONNX model saved to {output_path}")
+    
+    # Verify: ONNX Runtime vs PyTorch on batches of 1, 8 and 32
+    backend = ONNXRuntimeBackend(model, torch.device('cpu'), onnx_path=output_path)
+    print(f"Parity vs PyTorch: max |diff| = {backend.parity_max_diff:.2e}")
+
+
 if __name__ == "__main__":
     # Test inference pipeline
     print("Testing inference pipeline...")
     
-    # Convert to TorchScript
+    # Convert to TorchScript and ONNX
     if Path('models/sentinel_net_v1.pt').exists():
         convert_to_torchscript()
+        export_fused_model()
+        if Path('models/scaler.pkl').exists():
+            export_serving_model()
+            convert_to_onnx('models/sentinel_net_v1.pt', 'models/scaler.pkl', 'models/sentinel_net.onnx')
     
     # Test inference
     if Path('models/sentinel_net_v1.pt').exists() and Path('models/scaler.pkl').exists():
@@ -0,0 +1,89 @@
+"""
+MFCC engine for UrbanVoice Sentinel
+Analysis windows, mel filterbanks and DCT-II matrices are built once per
+configuration and reused, so MFCCs for one clip or a whole batch are a few
+NumPy matmuls over a [N, frames, bins] power array
+"""
+
+import threading
+
+import numpy as np
+import librosa
+
+
+class MFCCEngine:
+    """
+    Cached matrices keyed by configuration:
+        window      n_fft                       periodic Hann, [n_fft]
+        mel basis   (sr, n_fft, n_mels)         [n_fft // 2 + 1, n_mels]
+        DCT-II      (n_mels, n_mfcc)            orthonormal, [n_mels, n_mfcc]
+
+    Matches librosa.feature.mfcc (center=True, zero padding, power_to_db with
+    ref=1.0 and top_db=80 per clip, DCT-II norm='ortho').
+    """
+
+    def __init__(self, sample_rate=16000, n_mfcc=13, n_mels=128, top_db=80.0, amin=1e-10):
+        self.sr = sample_rate
+        self.n_mfcc = n_mfcc
+        self.n_mels = n_mels
+        self.top_db = top_db
+        self.amin = amin
+        self._windows = {}
+        self._mel_bases = {}
+        self._dct_matrices = {}
+        self._lock = threading.Lock()
+
+    def window(self, n_fft):
+        with self._lock:
+            if n_fft not in self._windows:
+                self._windows[n_fft] = librosa.filters.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+            return self._windows[n_fft]
+
+    def mel_basis(self, n_fft):
+        key = (self.sr, n_fft, self.n_mels)
+        with self._lock:
+            if key not in self._mel_bases:
+                # Stored transposed so [..., bins] @ basis -> [..., n_mels]
+                self._mel_bases[key] = np.ascontiguousarray(
+                    librosa.filters.mel(sr=self.sr, n_fft=n_fft, n_mels=self.n_mels).T
+                )
+            return self._mel_bases[key]
+
+    def dct_matrix(self):
+        key = (self.n_mels, self.n_mfcc)
+        with self._lock:
+            if key not in self._dct_matrices:
+                n = np.arange(self.n_mels)
+                k = np.arange(self.n_mfcc)[:, np.newaxis]
+                dct = np.cos(np.pi * k * (2 * n + 1) / (2 * self.n_mels)) * np.sqrt(2.0 / self.n_mels)
+                dct[0] /= np.sqrt(2.0)
+                self._dct_matrices[key] = np.ascontiguousarray(dct.T.astype(np.float32))
+            return self._dct_matrices[key]
+
+    def power_frames(self, audio, n_fft, hop_length):
+        """Centred STFT power of one clip as [frames, bins]"""
+        padded = np.pad(audio.astype(np.float32), n_fft // 2)
+        frames = librosa.util.frame(padded, frame_length=n_fft, hop_length=hop_length, axis=0)
+        return np.abs(np.fft.rfft(frames * self.window(n_fft), axis=-1)) ** 2
+
+    def mfcc(self, power, n_fft):
+        """[N, frames, bins] (or [frames, bins]) power -> [N, n_mfcc, frames] (or [n_mfcc, frames])"""
+        power = np.asarray(power, dtype=np.float32)
+        single = power.ndim == 2
+        if single:
+            power = power[np.newaxis]
+
+        n_clips, n_frames, n_bins = power.shape
+        # One 2-D GEMM over every frame of every clip instead of N stacked matmuls
+        mel = power.reshape(-1, n_bins) @ self.mel_basis(n_fft)
+        log_mel = np.log10(np.maximum(mel, self.amin, out=mel), out=mel)
+        log_mel *= 10.0
+        log_mel = log_mel.reshape(n_clips, n_frames, self.n_mels)
+        if self.top_db is not None:
+            # top_db is relative to each clip's own peak, as in librosa.power_to_db
+            peak = log_mel.max(axis=(1, 2), keepdims=True)
+            np.maximum(log_mel, peak - self.top_db, out=log_mel)
+
+        mfcc = (log_mel.reshape(-1, self.n_mels) @ self.dct_matrix())
+        mfcc = mfcc.reshape(n_clips, n_frames, self.n_mfcc).transpose(0, 2, 1)
+        return mfcc[0] if single else mfcc
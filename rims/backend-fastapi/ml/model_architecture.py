@@ -119,12 +119,151 @@ class SentinelNet(nn.Module):
         return sum(p.numel() for p in self.parameters() if p.requires_grad)
 
 
-def create_sentinel_net():
+class FusedSentinelNet(nn.Module):
+    """
+    Inference-only SentinelNet: BatchNorm folded into conv1-3/fc1/fc2 and
+    Dropout removed, so each conv block is Conv -> in-place ReLU -> MaxPool
+    (which the TorchScript and ONNX Runtime backends fuse further).
+    Input/output shapes are identical to SentinelNet.
+    """
+    
+    def __init__(self, input_channels=13):
+        super(FusedSentinelNet, self).__init__()
+        
+        self.conv1 = nn.Conv1d(input_channels, 32, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv1d(32, 64, kernel_size=3, padding=1)
+        self.conv3 = nn.Conv1d(64, 128, kernel_size=3, padding=1)
+        
+        self.lstm = nn.LSTM(
+            input_size=128,
+            hidden_size=128,
+            num_layers=2,
+            batch_first=True,
+            bidirectional=True
+        )
+        
+        self.fc1 = nn.Linear(128 * 2, 64)
+        self.fc2 = nn.Linear(64, 32)
+        self.fc3 = nn.Linear(32, 1)
+    
+    def forward(self, x):
+        x = F.max_pool1d(F.relu(self.conv1(x), inplace=True), 2)
+        x = F.max_pool1d(F.relu(self.conv2(x), inplace=True), 2)
+        x = F.max_pool1d(F.relu(self.conv3(x), inplace=True), 2)
+        
+        _, (h_n, _) = self.lstm(x.permute(0, 2, 1))
+        hidden = torch.cat([h_n[-2], h_n[-1]], dim=1)
+        
+        x = F.relu(self.fc1(hidden), inplace=True)
+        x = F.relu(self.fc2(x), inplace=True)
+        return torch.sigmoid(self.fc3(x))
+
+
+class FeatureNormalization(nn.Module):
+    """
+    StandardScaler.transform as a tensor op: (x - mean_) / scale_ per MFCC
+    coefficient and frame. The statistics differ per frame, so they cannot be
+    folded into conv1 (its weights are shared across time); this is a first layer.
+    """
+    
+    def __init__(self, mean=None, scale=None, shape=(13, 100)):
+        super(FeatureNormalization, self).__init__()
+        mean = torch.zeros(shape) if mean is None else torch.as_tensor(mean, dtype=torch.float32)
+        scale = torch.ones(shape) if scale is None else torch.as_tensor(scale, dtype=torch.float32)
+        self.register_buffer('mean', mean.reshape(shape).clone())
+        self.register_buffer('inv_scale', 1.0 / scale.reshape(shape))
+    
+    def forward(self, x):
+        return (x - self.mean) * self.inv_scale
+
+
+class NormalizedSentinelNet(nn.Module):
+    """SentinelNet (or FusedSentinelNet) that takes raw MFCCs; the feature scaler is its first layer"""
+    
+    def __init__(self, net, mean=None, scale=None):
+        super(NormalizedSentinelNet, self).__init__()
+        self.normalize = FeatureNormalization(mean, scale)
+        self.net = net
+    
+    def forward(self, x):
+        return self.net(self.normalize(x))
+
+
+def fold_batchnorm(layer, bn):
+    """Return (weight, bias) of layer with the eval-mode BatchNorm that follows it folded in"""
+    scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    shape = (-1,) + (1,) * (layer.weight.dim() - 1)
+    weight = layer.weight * scale.view(shape)
+    bias = (layer.bias - bn.running_mean) * scale + bn.bias
+    return weight.detach().clone(), bias.detach().clone()
+
+
+def fuse_sentinel_net(model):
+    """Build a FusedSentinelNet with the same eval-mode outputs as a trained SentinelNet"""
+    if isinstance(model, NormalizedSentinelNet):
+        fused = NormalizedSentinelNet(fuse_sentinel_net(model.net))
+        fused.normalize.load_state_dict(model.normalize.state_dict())
+        return fused.to(next(model.parameters()).device).eval()
+    
+    model = model.eval()
+    fused = FusedSentinelNet(input_channels=model.conv1.in_channels)
+    
+    with torch.no_grad():
+        for layer, bn in (('conv1', 'bn1'), ('conv2', 'bn2'), ('conv3', 'bn3'),
+                          ('fc1', 'bn_fc1'), ('fc2', 'bn_fc2')):
+            weight, bias = fold_batchnorm(getattr(model, layer), getattr(model, bn))
+            getattr(fused, layer).weight.copy_(weight)
+            getattr(fused, layer).bias.copy_(bias)
+        fused.fc3.load_state_dict(model.fc3.state_dict())
+        fused.lstm.load_state_dict(model.lstm.state_dict())
+    
+    return fused.to(next(model.parameters()).device).eval()
+
+
+def verify_fused_equivalence(model, fused, batch_sizes=(1, 8, 32), atol=1e-5):
+    """Max |fused - original| over random batches; raises if it exceeds atol"""
+    device = next(model.parameters()).device
+    generator = torch.Generator().manual_seed(0)
+    max_diff = 0.0
+    with torch.no_grad():
+        for batch_size in batch_sizes:
+            x = torch.randn(batch_size, 13, 100, generator=generator).to(device)
+            max_diff = max(max_diff, (fused.eval()(x) - model.eval()(x)).abs().max().item())
+    if max_diff > atol:
+        raise ValueError(f"Fused SentinelNet differs from the original by {max_diff:.2e} (atol {atol:.0e})")
+    return max_diff
+
+
+def is_fused(model):
+    """True if model (or the net inside a NormalizedSentinelNet) is a FusedSentinelNet"""
+    if isinstance(model, NormalizedSentinelNet):
+        model = model.net
+    return isinstance(model, FusedSentinelNet)
+
+
+def sentinel_net_from_state_dict(state_dict):
+    """Instantiate whichever SentinelNet variant saved state_dict and load it"""
+    normalized = any(key.startswith('normalize.') for key in state_dict)
+    net_keys = [key[len('net.'):] if normalized else key for key in state_dict if not key.startswith('normalize.')]
+    
+    # Fused weights have no BatchNorm entries
+    if any(key.startswith('bn') for key in net_keys):
+        net = create_sentinel_net(verbose=False)
+    else:
+        net = FusedSentinelNet()
+    
+    model = NormalizedSentinelNet(net) if normalized else net
+    model.load_state_dict(state_dict)
+    return model
+
+
+def create_sentinel_net(verbose=True):
     """Factory function to create SentinelNet model"""
     model = SentinelNet(input_channels=13, sequence_length=100)
-    print(f"SentinelNet created:")
-    print(f"  Parameters: {model.count_parameters():,}")
-    print(f"  Model size: {model.get_model_size():.2f} MB")
+    if verbose:
+        print(f"SentinelNet created:")
+        print(f"  Parameters: {model.count_parameters():,}")
+        print(f"  Model size: {model.get_model_size():.2f} MB")
     return model
 
 
@@ -0,0 +1,134 @@
+"""
+Structured logging for the UrbanVoice Sentinel pipeline
+One JSON object per line, tagged with the correlation ID of the request
+being processed. Feature-level debug traces are sampled per request (all
+or nothing for a given request) and cost a single flag check when off:
+
+    if tracing():
+        trace("calibrate_risk", jitter=jitter, final_probability=p)
+"""
+
+import contextvars
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+
+logger = logging.getLogger("urbanvoice")
+
+_request_id = contextvars.ContextVar("urbanvoice_request_id", default=None)
+_trace = contextvars.ContextVar("urbanvoice_trace", default=False)
+
+# Set by configure_logging(); while False, tracing() never looks at the context
+_tracing_configured = False
+_debug_sample_rate = 0.0
+
+# LogRecord attributes that are not user fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class _RequestContextFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """{"ts", "level", "logger", "event", "request_id", **fields}"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable variant for local development"""
+
+    def format(self, record):
+        fields = " ".join(f"{key}={value}" for key, value in vars(record).items()
+                          if key not in _RESERVED and key != "request_id")
+        line = (f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} "
+                f"[{getattr(record, 'request_id', None) or '-'}] {record.getMessage()} {fields}").rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level="INFO", log_format="json", debug_sample_rate=0.0, stream=None):
+    """
+    Attach one handler to the "urbanvoice" logger. level=DEBUG traces every
+    request; otherwise debug_sample_rate is the fraction of requests traced.
+    """
+    global _tracing_configured, _debug_sample_rate
+    requested = level
+    if isinstance(level, str):
+        level = getattr(logging, level.strip().upper(), None)
+    # A typo in LOG_LEVEL must not stop the service from starting
+    unknown_level = not isinstance(level, int)
+    if unknown_level:
+        level = logging.INFO
+    _debug_sample_rate = 1.0 if level <= logging.DEBUG else max(0.0, min(1.0, debug_sample_rate))
+    _tracing_configured = _debug_sample_rate > 0
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+    handler.addFilter(_RequestContextFilter())
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG if _tracing_configured else level)
+    logger.propagate = False
+    if unknown_level:
+        log_event(logging.WARNING, "unknown_log_level", requested=requested, using="INFO")
+
+
+def start_request(request_id=None, force_trace=False):
+    """Bind a correlation ID (and the sampling decision) to the current context; returns reset tokens"""
+    traced = _tracing_configured and (force_trace or random.random() < _debug_sample_rate)
+    return (_request_id.set(request_id or uuid.uuid4().hex), _trace.set(traced))
+
+
+def end_request(tokens):
+    _request_id.reset(tokens[0])
+    _trace.reset(tokens[1])
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def log_context():
+    """Picklable (request_id, traced) pair for handing the context to a worker process"""
+    return (_request_id.get(), _trace.get())
+
+
+def apply_log_context(context):
+    """Inverse of log_context() inside a worker; returns tokens for end_request()"""
+    request_id, traced = context if context else (None, False)
+    return (_request_id.set(request_id), _trace.set(traced and _tracing_configured))
+
+
+def tracing():
+    """True if the current request was sampled for feature-level debug traces"""
+    return _tracing_configured and _trace.get()
+
+
+def trace(event, **fields):
+    """Debug trace for a sampled request; guard the call with tracing() so fields are not built otherwise"""
+    logger.debug(event, extra=fields)
+
+
+def log_event(level, event, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra=fields)
@@ -0,0 +1,173 @@
+"""
+Per-request profiling for UrbanVoice Sentinel
+Runs one clip through the same steps as UrbanVoiceInference.process_bytes
+while a sampling profiler records the Python stacks of the calling thread
+(librosa / NumPy / feature code, written as a speedscope file) and
+torch.profiler records the forward pass (written as a Chrome trace)
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import torch
+
+SPEEDSCOPE_FILE = 'speedscope.json'
+CHROME_TRACE_FILE = 'forward_trace.json'
+
+_torch_profiler_ready = False
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every interval_ms from a helper thread.
+
+    Each sample is weighted by the wall time since the previous one, so time
+    spent in C code that holds the GIL (and delays sampling) is still
+    attributed to the stack that was running.
+    """
+
+    def __init__(self, thread_id=None, interval_ms=1.0, max_depth=128):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.frames = []
+        self._frame_index = {}
+        self.samples = []
+        self.weights = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.duration_ms = 0.0
+
+    def _frame_id(self, code):
+        key = (code.co_filename, code.co_firstlineno, getattr(code, 'co_qualname', code.co_name))
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({'name': key[2], 'file': key[0], 'line': key[1]})
+        return index
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(self._frame_id(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            stack = self._sample()
+            now = time.perf_counter()
+            if stack:
+                self.samples.append(stack)
+                self.weights.append((now - last) * 1000)
+            last = now
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        return False
+
+    def to_speedscope(self, name):
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(sum(self.weights), 3),
+                'samples': self.samples,
+                'weights': [round(weight, 3) for weight in self.weights]
+            }],
+            'name': name,
+            'activeProfileIndex': 0,
+            'exporter': 'urbanvoice-sentinel'
+        }
+
+
+def _init_torch_profiler():
+    """The first torch.profiler session initializes Kineto (~1-2s); keep that out of the first profile"""
+    global _torch_profiler_ready
+    if not _torch_profiler_ready:
+        with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU]):
+            pass
+        _torch_profiler_ready = True
+
+
+def profile_bytes(engine, data, suffix, output_dir, interval_ms=1.0):
+    """
+    process_bytes() for one upload with profiling; returns (result, profile summary).
+    Writes speedscope.json (whole pipeline) and forward_trace.json (step 6) to output_dir.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _init_torch_profiler()
+    start_time = time.time()
+
+    with StackSampler(interval_ms=interval_ms) as sampler:
+        try:
+            # Steps 1-5: Load, clean, featurize, normalize
+            features = engine.extract_features_from_bytes(data, suffix)
+
+            # Step 6: Model inference (PyTorch ops only; an ONNX Runtime backend shows up as one opaque call)
+            step6_start = time.time()
+            with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU],
+                                        record_shapes=True) as forward_profile:
+                with torch.profiler.record_function('sentinel_net_forward'):
+                    probability = engine.predict(features['mfcc_normalized'])
+            step6_time = (time.time() - step6_start) * 1000
+
+            # Step 7: Calibrate risk and compile result
+            result = engine.build_result(features, probability, step6_time, start_time)
+        except Exception as e:
+            forward_profile = None
+            result = engine.error_result(e, start_time)
+
+    (output_dir / SPEEDSCOPE_FILE).write_text(json.dumps(sampler.to_speedscope(output_dir.name)))
+    files = [SPEEDSCOPE_FILE]
+    if forward_profile is not None:
+        forward_profile.export_chrome_trace(str(output_dir / CHROME_TRACE_FILE))
+        files.append(CHROME_TRACE_FILE)
+
+    summary = {
+        'id': output_dir.name,
+        'duration_ms': round(sampler.duration_ms, 2),
+        'samples': len(sampler.samples),
+        'files': files
+    }
+    (output_dir / 'summary.json').write_text(json.dumps({**summary, 'created': start_time}))
+    return result, summary
+
+
+def list_profiles(profile_dir):
+    """Stored profiles, newest first"""
+    profiles = []
+    for summary_path in Path(profile_dir).glob('*/summary.json'):
+        try:
+            profiles.append(json.loads(summary_path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda profile: profile.get('created', 0), reverse=True)
+
+
+def prune_profiles(profile_dir, max_profiles):
+    """Delete the oldest profiles beyond max_profiles"""
+    for profile in list_profiles(profile_dir)[max_profiles:]:
+        profile_path = Path(profile_dir) / profile['id']
+        for file in profile_path.iterdir():
+            file.unlink()
+        profile_path.rmdir()
@@ -0,0 +1,76 @@
+"""
+Bulk re-scoring over the UrbanVoice Sentinel feature store
+Runs stored MFCCs + acoustic statistics through the current model and
+calibration without touching any audio or DSP code
+
+Usage:
+    python ml/rescore_features.py --store feature_store --model models/respira_net_v1.pt
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from inference_pipeline import UrbanVoiceInference
+
+
+def rescore(engine, batch_size=256):
+    """Score every clip in engine.feature_store; returns {audio digest: result}"""
+    results = {}
+    for keys, mfcc_batch, stats_batch in engine.feature_store.iter_batches(batch_size):
+        probabilities = engine.predict_batch(list(engine.normalize_batch(mfcc_batch)))
+        for key, probability, stats in zip(keys, probabilities, stats_batch):
+            acoustic_features = engine.audio_processor.score_acoustic_stats(stats)
+            risk = engine.calibrate_risk(probability, acoustic_features)
+            results[key] = {
+                'probability': round(probability, 6),
+                'model_version': engine.model_version,
+                **risk,
+                'features': acoustic_features
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored features with the current model")
+    parser.add_argument('--store', required=True, help="Feature store root directory (FEATURE_STORE_DIR)")
+    parser.add_argument('--model', default='models/respira_net_v1.pt', help="Model weights to score with")
+    parser.add_argument('--scaler', default='models/scaler.pkl', help="Feature scaler")
+    parser.add_argument('--backend', default='eager', help="Inference backend (eager, torchscript, int8)")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--output', default='rescored_results.json')
+    args = parser.parse_args()
+
+    engine = UrbanVoiceInference(model_path=args.model, scaler_path=args.scaler, feature_store_dir=args.store,
+                                 backend=args.backend)
+    n_clips = len(engine.feature_store)
+    if n_clips == 0:
+        print(f"[WARN] No stored features for this preprocessing config under {args.store}")
+        return
+
+    print(f"Re-scoring {n_clips} stored clips...")
+    start_time = time.time()
+    results = rescore(engine, batch_size=args.batch_size)
+    elapsed = time.time() - start_time
+
+    summary = {}
+    for result in results.values():
+        summary[result['risk_level']] = summary.get(result['risk_level'], 0) + 1
+
+    Path(args.output).write_text(json.dumps({
+        'model_version': engine.model_version,
+        'model_digest': engine.model_digest,
+        'n_clips': len(results),
+        'elapsed_seconds': round(elapsed, 3),
+        'risk_distribution': summary,
+        'results': results
+    }, indent=2))
+
+    print(f"[OK] Re-scored {len(results)} clips in {elapsed:.2f}s ({len(results) / max(elapsed, 1e-9):.0f} clips/s)")
+    print(f"  Risk distribution: {summary}")
+    print(f"  Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
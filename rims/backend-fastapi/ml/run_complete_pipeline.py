@@ -75,6 +75,19 @@ def main():
         print(f"[ERROR] TorchScript conversion failed: {e}")
         return
     
+    # Serving model: scaler + folded BatchNorm in one state_dict, so the API needs no sklearn/pickle
+    try:
+        from inference_pipeline import export_serving_model
+        
+        export_serving_model(
+            model_path='models/sentinel_net_v1.pt',
+            scaler_path='models/scaler.pkl',
+            output_path='models/sentinel_net_serving.pt'
+        )
+    except Exception as e:
+        print(f"[ERROR] Serving model export failed: {e}")
+        return
+    
     # Step 4: Generate Demo Samples
     print_header("STEP 4/5: Generating Demo Audio Samples")
     try:
@@ -118,6 +131,7 @@ def main():
     print("     +-- y_risk.npy (labels)")
     print("     +-- sentinel_net_v1.pt (trained model)")
     print("     +-- sentinel_net_ts.pt (TorchScript)")
+    print("     +-- sentinel_net_serving.pt (scaler + folded BatchNorm, for the API)")
     print("     +-- scaler.pkl (normalization)")
     print("     +-- train_history.json (CV results)")
     print("     +-- demo_results.json (test predictions)")